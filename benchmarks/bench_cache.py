@@ -0,0 +1,51 @@
+"""Compare loading a raw j1 payload with loading the compact cache entry.
+
+usage: python -m benchmarks.bench_cache PAYLOAD.json [PAYLOAD.json ...]
+"""
+
+import sys
+import tracemalloc
+from json import loads
+from timeit import repeat
+
+from wttrbarpy import cache
+
+
+def retained_size(func, raw) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(raw)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def best_time(func, raw, number=200) -> float:
+    return min(repeat(lambda: func(raw), number=number, repeat=5)) / number
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        sys.exit(__doc__.strip())
+
+    print(
+        f"{'payload':<30} {'format':<8} {'bytes':>8} {'load (us)':>10} {'resident':>10}"
+    )
+    for path in sys.argv[1:]:
+        with open(path, "rb") as f:
+            raw_json = f.read()
+        raw_cache = cache.dumps(loads(raw_json), fetched_at=0)
+
+        for name, func, raw in (
+            ("json", lambda x: loads(x.decode()), raw_json),
+            ("compact", cache.loads, raw_cache),
+        ):
+            print(
+                f"{path[-30:]:<30} {name:<8} {len(raw):>8} "
+                f"{best_time(func, raw) * 1e6:>10.1f} {retained_size(func, raw):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
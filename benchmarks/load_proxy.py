@@ -0,0 +1,113 @@
+"""Load test the proxy against a local stand-in upstream.
+
+Every client thread keeps asking for a random location, half of the requests
+with the ETag it saw last, and the report shows the throughput, latency and
+how many requests reached the upstream (ideally one per location).
+
+usage: python -m benchmarks.load_proxy PAYLOAD.json [--clients N] [--requests N]
+"""
+
+import random
+from argparse import ArgumentParser
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import quantiles
+from threading import Lock, Thread
+from time import perf_counter, sleep
+
+from wttrbarpy.providers import WttrProvider
+from wttrbarpy.proxy import ProxyCache, ProxyServer
+
+
+def start_upstream(body: bytes, delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="load_proxy")
+    parser.add_argument("payload", help="recorded j1 payload served by the upstream")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="per client")
+    parser.add_argument("--locations", type=int, default=5)
+    parser.add_argument("--upstream-delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with open(args.payload, "rb") as f:
+        upstream = start_upstream(f.read(), args.upstream_delay)
+
+    provider = WttrProvider(
+        endpoints=[f"http://127.0.0.1:{upstream.server_address[1]}/{{}}"],
+        timeout=30,
+    )
+    cache = ProxyCache(provider, ttl=3600)
+    proxy = ProxyServer(("127.0.0.1", 0), cache)
+    Thread(target=proxy.serve_forever, daemon=True).start()
+    port = proxy.server_address[1]
+
+    latencies = []
+    statuses = {}
+    lock = Lock()
+
+    def client(seed: int) -> None:
+        rng = random.Random(seed)
+        etags = {}
+        conn = HTTPConnection("127.0.0.1", port, timeout=60)
+        results = []
+
+        for _ in range(args.requests):
+            location = f"city{rng.randrange(args.locations)}"
+            headers = {}
+            if location in etags and rng.random() < 0.5:
+                headers["If-None-Match"] = etags[location]
+
+            start = perf_counter()
+            conn.request("GET", f"/{location}?format=j1", headers=headers)
+            response = conn.getresponse()
+            response.read()
+            results.append((perf_counter() - start, response.status))
+            etags[location] = response.getheader("ETag")
+
+        conn.close()
+        with lock:
+            for latency, status in results:
+                latencies.append(latency)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    threads = [Thread(target=client, args=(i,)) for i in range(args.clients)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    proxy.shutdown()
+    upstream.shutdown()
+
+    p50, p90, p99 = (quantiles(latencies, n=100)[i] for i in (49, 89, 98))
+    print(f"requests: {len(latencies)} from {args.clients} clients in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency: p50 {p50 * 1e3:.1f}ms p90 {p90 * 1e3:.1f}ms p99 {p99 * 1e3:.1f}ms")
+    print(f"statuses: {dict(sorted(statuses.items()))}")
+    print(
+        f"upstream requests: {cache.upstream_requests} for {args.locations} locations"
+    )
+
+
+if __name__ == "__main__":
+    main()
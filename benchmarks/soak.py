@@ -0,0 +1,196 @@
+"""Soak test fetch + render for leaks and memory growth.
+
+Serves the given recorded payloads from a local stand-in server, then fetches
+and renders them with a rotating set of options for many cycles. The run
+fails if RSS or the allocations wttrbarpy is responsible for (in its own code
+or in stdlib code it calls) keep growing after the warmup, and the source
+lines that grew the most are reported.
+
+usage: python -m benchmarks.soak PAYLOAD.json [PAYLOAD.json ...] [--cycles N]
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread, active_count
+from time import sleep
+
+import wttrbarpy
+from wttrbarpy.config import build_config, get_parser
+from wttrbarpy.formats import format_text, format_tooltip
+from wttrbarpy.providers import WttrProvider
+
+# deep enough to reach wttrbarpy from the stdlib frames it calls into
+TRACE_DEPTH = 25
+
+OPTION_SETS = (
+    [],
+    ["--emoji"],
+    ["--fahrenheit", "--format-type", "3", "--show-temp-unit"],
+    ["--format-type", "1", "--ampm", "--hide-wind-details"],
+    ["--main-indicator", "humidity", "--vertical-view", "--emoji"],
+    ["--custom-indicator", "$icon $temp_C ($FeelsLikeC)"],
+    ["--neutral-icon", "--plain-text", "--max-conditions", "2"],
+    ["--hour-text-only", "--hide-conditions", "--date-format", "%d/%m"],
+)
+
+
+def start_server(payloads: list[bytes]) -> HTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = payloads[int(self.path.strip("/")) % len(payloads)]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    # requests are sequential, a single threaded server keeps the snapshots quiet
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_rss() -> int:
+    with open("/proc/self/statm", "r") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def settle() -> None:
+    gc.collect()
+    # the type attribute cache keeps the last looked up attribute names alive,
+    # it is bounded but takes thousands of cycles to fill up
+    sys._clear_type_cache()
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="soak")
+    parser.add_argument("payloads", nargs="+", help="recorded j1 payload files")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--max-rss-growth",
+        type=int,
+        default=4 << 20,
+        help="allowed RSS growth in bytes over all cycles",
+    )
+    parser.add_argument(
+        "--max-alloc-growth",
+        type=float,
+        default=16,
+        help="allowed growth of allocations made by wttrbarpy in bytes per cycle",
+    )
+    parser.add_argument(
+        "--max-count-growth",
+        type=float,
+        default=0.05,
+        help="allowed growth of the number of blocks allocated by wttrbarpy per cycle",
+    )
+    args = parser.parse_args()
+
+    payloads = []
+    for path in args.payloads:
+        with open(path, "rb") as f:
+            payloads.append(f.read())
+
+    server = start_server(payloads)
+    provider = WttrProvider(
+        endpoints=[f"http://127.0.0.1:{server.server_address[1]}/{{}}"],
+        timeout=10,
+    )
+    option_sets = [get_parser().parse_args(x) for x in OPTION_SETS]
+
+    threads = active_count()
+
+    def run(cycles: int, offset: int = 0) -> None:
+        for i in range(offset, offset + cycles):
+            data = provider.fetch(str(i % len(payloads)))
+            config = build_config(data, option_sets[i % len(option_sets)])
+            format_text(config=config)
+            format_tooltip(config=config)
+
+        # let the request threads of the provider finish before measuring
+        while active_count() > threads:
+            sleep(0.01)
+
+    # RSS is measured without tracemalloc, its own bookkeeping grows too
+    run(args.warmup)
+    gc.collect()
+    rss_before = get_rss()
+    run(args.cycles, offset=args.warmup)
+    gc.collect()
+    rss_growth = get_rss() - rss_before
+
+    tracemalloc.start(TRACE_DEPTH)
+    run(args.warmup)
+    settle()
+    before = tracemalloc.take_snapshot()
+    run(args.cycles, offset=args.warmup)
+    settle()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    server.shutdown()
+
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+    after = after.filter_traces(filters)
+    before = before.filter_traces(filters)
+    stats = after.compare_to(before, "lineno")
+
+    # the limits only apply to allocations with wttrbarpy somewhere on the
+    # stack, the stand-in server allocates on its own thread
+    package_dir = os.path.dirname(wttrbarpy.__file__)
+    own_stats = [
+        x
+        for x in after.compare_to(before, "traceback")
+        if any(frame.filename.startswith(package_dir) for frame in x.traceback)
+    ]
+    size_growth = sum(x.size_diff for x in own_stats) / args.cycles
+    count_growth = sum(x.count_diff for x in own_stats) / args.cycles
+    total_growth = sum(x.size_diff for x in stats) / args.cycles
+
+    print(
+        f"cycles: {args.cycles} ({len(payloads)} payloads, {len(option_sets)} option sets)"
+    )
+    print(f"rss growth: {rss_growth} bytes")
+    print(f"traced growth: {total_growth:.2f} bytes/cycle")
+    print(
+        f"wttrbarpy growth: {size_growth:.2f} bytes/cycle, {count_growth:.4f} blocks/cycle"
+    )
+    print("top growth by source line:")
+    for stat in sorted(stats, key=lambda x: x.size_diff, reverse=True)[: args.top]:
+        frame = stat.traceback[0]
+        print(
+            f"  {stat.size_diff / args.cycles:>10.2f} B/cycle {stat.count_diff:>+6} blocks"
+            f"  {frame.filename}:{frame.lineno}"
+        )
+
+    failed = False
+    if rss_growth > args.max_rss_growth:
+        print(f"FAIL: rss grew by more than {args.max_rss_growth} bytes")
+        failed = True
+    if size_growth > args.max_alloc_growth:
+        print(
+            f"FAIL: allocations grew by more than {args.max_alloc_growth} bytes/cycle"
+        )
+        failed = True
+    if count_growth > args.max_count_growth:
+        print(
+            f"FAIL: allocations grew by more than {args.max_count_growth} blocks/cycle"
+        )
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
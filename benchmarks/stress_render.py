@@ -0,0 +1,104 @@
+"""Check that wttrbarpy.render() is deterministic under concurrency.
+
+Every (payload, options, now) combination is rendered once serially, then
+rendered again in random order from many threads and serially again under a
+few host timezones. Any difference from the first render, or any change to a
+payload, fails the run.
+
+usage: python -m benchmarks.stress_render PAYLOAD.json [PAYLOAD.json ...] [--threads N]
+"""
+
+import os
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import product
+from json import dumps, load
+from time import perf_counter
+
+from wttrbarpy import Options, render
+
+OPTION_SETS = (
+    Options(),
+    Options(emoji=True),
+    Options(unit="USCS", format_type=3, show_temp_unit=True),
+    Options(format_type=1, ampm=True, hide_wind_details=True),
+    Options(main_indicator="temp_C", unit="USCS"),
+    Options(main_indicator="humidity", vertical_view=True, emoji=True),
+    Options(custom_indicator="$icon $temp_C ($FeelsLikeC)"),
+    Options(neutral_icon=True, plain_text=True, max_conditions=2),
+    Options(interpolate=True, offline_astronomy=True),
+)
+TIMES = (
+    datetime(2026, 10, 19, 0, 30),
+    datetime(2026, 10, 19, 7, 15),
+    datetime(2026, 10, 19, 13, 0),
+    datetime(2026, 10, 19, 22, 45),
+    datetime(2026, 10, 19, 11, 0, tzinfo=timezone.utc),
+    datetime(2026, 10, 19, 18, 0, tzinfo=timezone(timedelta(hours=-4))),
+)
+# the host timezone must not change any render
+TIMEZONES = ("UTC", "America/New_York", "Asia/Dhaka", "Pacific/Chatham")
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="stress_render")
+    parser.add_argument("payloads", nargs="+", help="recorded j1 payload files")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = []
+    for path in args.payloads:
+        with open(path, "r") as f:
+            payloads.append(load(f))
+    snapshots = [dumps(x, sort_keys=True) for x in payloads]
+
+    jobs = list(product(range(len(payloads)), range(len(OPTION_SETS)), TIMES))
+    expected = {
+        job: render(payloads[job[0]], OPTION_SETS[job[1]], now=job[2]) for job in jobs
+    }
+
+    def check(job: tuple) -> bool:
+        payload_idx, options_idx, now = job
+        return (
+            render(payloads[payload_idx], OPTION_SETS[options_idx], now=now)
+            == expected[job]
+        )
+
+    work = jobs * args.rounds
+    random.shuffle(work)
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        mismatches = sum(not x for x in executor.map(check, work))
+    elapsed = perf_counter() - start
+
+    tz_mismatches = 0
+    original_tz = os.environ.get("TZ")
+    for tz in TIMEZONES:
+        os.environ["TZ"] = tz
+        time.tzset()
+        tz_mismatches += sum(not check(job) for job in jobs)
+
+    if original_tz is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = original_tz
+    time.tzset()
+
+    mutated = sum(dumps(x, sort_keys=True) != y for x, y in zip(payloads, snapshots))
+
+    print(f"renders: {len(work)} on {args.threads} threads in {elapsed:.2f}s")
+    print(
+        f"mismatches: {mismatches}, timezone mismatches: {tz_mismatches}, "
+        f"mutated payloads: {mutated}"
+    )
+    sys.exit(1 if mismatches or tz_mismatches or mutated else 0)
+
+
+if __name__ == "__main__":
+    main()
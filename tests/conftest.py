@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, load, loads
+from threading import Lock, Thread
+from time import sleep
+
+import pytest
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "j1.json")
+UNKNOWN_LOCATION = dumps(
+    {"data": {"error": [{"msg": "Unable to find any matching weather location"}]}}
+).encode()
+
+
+class Upstream:
+    """Stand-in wttr.in serving a payload, with a tunable delay and failure mode.
+
+    `fail` can be None (serve the payload), "error" (HTTP 500), "json" (a body
+    that isn't json), "j1" (wttr.in's json error for unknown locations) or
+    "close" (drop the connection without a response).
+    """
+
+    def __init__(self, payload: dict) -> None:
+        self.body = dumps(payload).encode()
+        self.delay = 0.0
+        self.fail = None
+        self.paths = []
+        self._lock = Lock()
+
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with upstream._lock:
+                    upstream.paths.append(self.path)
+
+                sleep(upstream.delay)
+                if upstream.fail == "close":
+                    self.close_connection = True
+                    return
+                if upstream.fail == "error":
+                    self.send_error(500)
+                    return
+
+                body = {"json": b"<html>", "j1": UNKNOWN_LOCATION}.get(
+                    upstream.fail, upstream.body
+                )
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{{}}?format=j1"
+
+    @property
+    def hits(self) -> int:
+        with self._lock:
+            return len(self.paths)
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def payload() -> dict:
+    with open(FIXTURE, "r") as f:
+        return load(f)
+
+
+@pytest.fixture
+def upstream_factory(payload):
+    upstreams = []
+
+    def make() -> Upstream:
+        upstream = Upstream(payload)
+        upstreams.append(upstream)
+        return upstream
+
+    yield make
+
+    for upstream in upstreams:
+        upstream.close()
+
+
+@pytest.fixture
+def upstream(upstream_factory) -> Upstream:
+    return upstream_factory()
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    # nothing a test does may touch the real ~/.cache
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def run_wttrbarpy(cache_home):
+    """Run the cli in a subprocess, with the test cache dir."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "XDG_CACHE_HOME": str(cache_home), "PYTHONPATH": root}
+
+    def run(*args: str) -> dict:
+        result = subprocess.run(
+            [sys.executable, "-m", "wttrbarpy", *args],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        assert result.returncode == 0, result.stderr
+        return loads(result.stdout)
+
+    return run
@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from wttrbarpy.astronomy import (
+    get_astronomy,
+    get_moon_phase,
+    get_sun_times,
+    update_astronomy,
+)
+
+BERLIN = (52.52, 13.40)
+NEW_YORK = (40.71, -74.01)
+LONGYEARBYEN = (78.22, 15.65)
+MCMURDO = (-77.85, 166.67)
+
+
+def assert_close(actual: datetime, expected: datetime) -> None:
+    # the sunrise equation is good to a couple of minutes
+    assert abs(actual - expected) < timedelta(minutes=2)
+
+
+@pytest.mark.parametrize(
+    "day, location, sunrise, sunset",
+    [
+        # 07:39 and 18:05 CEST
+        (date(2026, 10, 19), BERLIN, (10, 19, 5, 39), (10, 19, 16, 5)),
+        # 05:29 and 20:31 EDT
+        (date(2026, 7, 1), NEW_YORK, (7, 1, 9, 29), (7, 2, 0, 31)),
+    ],
+)
+def test_sun_times(day, location, sunrise, sunset):
+    actual = get_sun_times(day, *location)
+
+    assert_close(actual[0], datetime(2026, *sunrise, tzinfo=timezone.utc))
+    assert_close(actual[1], datetime(2026, *sunset, tzinfo=timezone.utc))
+
+
+@pytest.mark.parametrize(
+    "day, location",
+    [
+        (date(2026, 6, 21), LONGYEARBYEN),
+        (date(2026, 12, 21), LONGYEARBYEN),
+        (date(2026, 12, 21), MCMURDO),
+    ],
+)
+def test_no_sun_times_in_polar_day_and_night(day, location):
+    assert get_sun_times(day, *location) == (None, None)
+
+
+def test_polar_day_and_night_in_j1_style():
+    summer = get_astronomy(date(2026, 6, 21), *LONGYEARBYEN, timedelta(hours=2))
+    winter = get_astronomy(date(2026, 12, 21), *LONGYEARBYEN, timedelta(hours=1))
+
+    assert (summer["sunrise"], summer["sunset"]) == ("12:00 AM", "11:59 PM")
+    assert (winter["sunrise"], winter["sunset"]) == ("12:00 AM", "12:00 AM")
+
+
+def test_local_times_in_j1_style():
+    astronomy = get_astronomy(date(2026, 10, 19), *BERLIN, timedelta(hours=2))
+
+    assert astronomy["sunrise"] == "07:39 AM"
+    assert astronomy["sunset"] == "06:05 PM"
+
+
+@pytest.mark.parametrize(
+    "when, phase",
+    [
+        ("2026-01-18 19:52", "New Moon"),
+        ("2026-02-01 22:09", "Full Moon"),
+        ("2026-10-10 15:50", "New Moon"),
+        ("2026-10-18 16:13", "First Quarter"),
+        ("2026-10-26 04:12", "Full Moon"),
+        ("2026-11-01 20:28", "Last Quarter"),
+    ],
+)
+def test_moon_phase(when, phase):
+    dt = datetime.fromisoformat(when).replace(tzinfo=timezone.utc)
+    assert get_moon_phase(dt) == phase
+
+
+def test_update_astronomy_uses_the_nearest_area(payload):
+    data = update_astronomy(payload, now=datetime(2026, 10, 19, 13, 0))
+    astronomy = data["weather"][0]["astronomy"][0]
+
+    assert (astronomy["sunrise"], astronomy["sunset"]) == ("07:39 AM", "06:05 PM")
+    # fields it doesn't compute are kept
+    assert astronomy["moonrise"] == payload["weather"][0]["astronomy"][0]["moonrise"]
@@ -0,0 +1,36 @@
+from datetime import datetime
+from json import dumps, loads
+
+import pytest
+
+from wttrbarpy import batch
+
+
+def test_renders_at_the_observation_time(payload):
+    batch.init_worker([[], ["--emoji"]], now=None)
+    lines, renders, errors = batch.render_chunk([("a.json", dumps(payload))])
+
+    assert (renders, errors) == (2, 0)
+    assert [loads(x)["options"] for x in lines] == [0, 1]
+    assert "Today, Monday Oct 19" in loads(lines[0])["tooltip"]
+
+    # the same as rendering at its localObsDateTime, whenever the batch runs
+    batch.init_worker([[], ["--emoji"]], now=datetime(2026, 10, 19, 13, 0))
+    assert batch.render_chunk([("a.json", dumps(payload))]) == (lines, 2, 0)
+
+
+def test_reports_errors_per_render(payload):
+    batch.init_worker([["--format-type", "9"]], now=None)
+    chunk = [("bad", "{"), ("a.json", dumps(payload))]
+    lines, renders, errors = batch.render_chunk(chunk)
+
+    # the invalid payload is an error line but not a render
+    assert (renders, errors) == (1, 2)
+    assert loads(lines[0])["error"].startswith("invalid json")
+    assert loads(lines[1])["error"].startswith("ValueError")
+
+
+@pytest.mark.parametrize("args", [["--jobs", "0"], ["--chunk-size", "-1"]])
+def test_rejects_non_positive_sizes(args):
+    with pytest.raises(SystemExit):
+        batch.main(["x.json", *args])
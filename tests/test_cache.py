@@ -0,0 +1,94 @@
+from datetime import datetime
+from time import monotonic, sleep
+
+import pytest
+
+from wttrbarpy import Options, render
+from wttrbarpy.cache import (
+    dumps,
+    load_payload,
+    loads,
+    lock_refresh,
+    project,
+    save_payload,
+)
+
+
+def test_round_trip(payload):
+    data, fetched_at = loads(dumps(payload, fetched_at=123.5))
+
+    assert fetched_at == 123.5
+    assert data == project(payload)
+
+
+def test_projection_drops_unused_fields(payload):
+    data = project(payload)
+
+    assert "request" not in data
+    assert "DewPointC" not in data["weather"][0]["hourly"][0]
+    assert data["current_condition"] == payload["current_condition"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        Options(),
+        Options(unit="USCS", format_type=3, emoji=True),
+        Options(format_type=1, ampm=True, plain_text=True),
+        Options(interpolate=True, offline_astronomy=True),
+    ],
+)
+def test_projection_renders_the_same(payload, options):
+    now = datetime(2026, 10, 19, 19, 30)
+    cached, _ = loads(dumps(payload, fetched_at=0))
+
+    assert render(cached, options, now=now) == render(payload, options, now=now)
+
+
+def test_rejects_invalid_entries():
+    with pytest.raises(ValueError):
+        loads(b"nope")
+
+
+def test_save_and_load(payload):
+    assert load_payload("Berlin") is None
+
+    save_payload("Berlin", payload, fetched_at=42.0)
+    assert load_payload(" berlin ") == (project(payload), 42.0)
+
+
+def test_does_not_save_other_payloads():
+    save_payload("x", {"not": "j1"})
+    assert load_payload("x") is None
+
+
+def test_only_one_refresh_at_a_time():
+    lock = lock_refresh("Berlin")
+    assert lock is not None
+    assert lock_refresh("Berlin") is None
+    assert lock_refresh("Dhaka") is not None
+
+    lock.close()
+    assert lock_refresh("Berlin") is not None
+
+
+def test_stale_while_revalidate(run_wttrbarpy, upstream):
+    args = ["-l", "Berlin", "--endpoint", upstream.endpoint, "--cache-ttl", "1"]
+
+    assert "class" not in run_wttrbarpy(*args)
+    sleep(1.1)
+
+    # the expired entry is shown right away and refreshed in the background
+    output = run_wttrbarpy(*args, "--stale-while-revalidate")
+    assert output["class"] == "stale"
+
+    deadline = monotonic() + 10
+    while upstream.hits < 2 and monotonic() < deadline:
+        sleep(0.05)
+    assert upstream.hits == 2
+
+    # the refresh holds its lock until the new payload is saved
+    while (lock := lock_refresh("Berlin")) is None and monotonic() < deadline:
+        sleep(0.05)
+    lock.close()
+    assert "class" not in run_wttrbarpy(*args, "--stale-while-revalidate")
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from json import dumps, loads
+
+import pytest
+
+from wttrbarpy.astronomy import get_utc_offset
+from wttrbarpy.config import get_render_parser
+from wttrbarpy.fanout import View, get_day_view, load_views, render_views
+from wttrbarpy.providers import WttrProvider
+
+
+def make_views(tmp_path) -> list[View]:
+    path = tmp_path / "views.json"
+    path.write_text(
+        dumps(
+            [
+                {"name": "temp", "output": str(tmp_path / "temp")},
+                {
+                    "name": "tomorrow",
+                    "output": str(tmp_path / "tomorrow"),
+                    "args": ["--custom-indicator", "$mintempC..$maxtempC"],
+                    "day": 1,
+                },
+            ]
+        )
+    )
+    return load_views(str(path))
+
+
+def test_renders_every_view_from_one_fetch(tmp_path, upstream):
+    views = make_views(tmp_path)
+    render_views(WttrProvider([upstream.endpoint], timeout=5), "Berlin", views)
+
+    assert upstream.hits == 1
+    assert "tooltip" in loads((tmp_path / "temp").read_text())
+    assert loads((tmp_path / "tomorrow").read_text())["text"] == "8..16"
+
+
+def test_survives_upstream_failures(tmp_path, upstream):
+    views = make_views(tmp_path)
+    provider = WttrProvider([upstream.endpoint], timeout=5)
+
+    for fail in ("close", "json", "error"):
+        upstream.fail = fail
+        render_views(provider, "Berlin", views)
+        assert loads((tmp_path / "temp").read_text())["text"] == "⚠️"
+
+
+def test_invalid_day_is_reported_per_view(tmp_path, upstream):
+    view = View(
+        name="far",
+        output=str(tmp_path / "far"),
+        args=get_render_parser("test").parse_args([]),
+        day=9,
+    )
+    render_views(WttrProvider([upstream.endpoint], timeout=5), "Berlin", [view])
+
+    assert loads((tmp_path / "far").read_text())["tooltip"].startswith("far: ")
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--location", "Dhaka"],
+        ["--endpoint", "http://localhost/{}"],
+        ["--cache-ttl", "60"],
+        ["--stale-while-revalidate"],
+        ["--trend-hours", "3"],
+        ["--history-size", "10"],
+    ],
+)
+def test_rejects_options_that_dont_change_the_render(tmp_path, args):
+    path = tmp_path / "views.json"
+    path.write_text(dumps([{"name": "x", "output": "-", "args": args}]))
+
+    with pytest.raises(SystemExit):
+        load_views(str(path))
+
+
+def test_day_view_keeps_the_utc_offset(payload):
+    assert get_utc_offset(get_day_view(payload, 1)) == timedelta(hours=2)
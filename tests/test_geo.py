@@ -0,0 +1,48 @@
+import pytest
+
+from wttrbarpy import geo
+
+
+@pytest.fixture
+def network(monkeypatch):
+    state = {"fingerprint": "eth0/0101A8C0|192.168.1.10", "time": 1000.0}
+    monkeypatch.setattr(geo, "get_network_fingerprint", lambda: state["fingerprint"])
+    monkeypatch.setattr(geo, "time", lambda: state["time"])
+    return state
+
+
+def test_round_trip(payload, network):
+    assert geo.load_cached_location(ttl=60) is None
+
+    geo.save_location(payload)
+    assert geo.load_cached_location(ttl=60) == "52.517,13.400"
+    assert geo.get_resolved_location(payload) == "52.517,13.400"
+
+
+def test_expires_after_ttl(payload, network):
+    geo.save_location(payload)
+
+    network["time"] += 60
+    assert geo.load_cached_location(ttl=60) == "52.517,13.400"
+    network["time"] += 1
+    assert geo.load_cached_location(ttl=60) is None
+
+
+def test_invalidated_by_network_change(payload, network):
+    geo.save_location(payload)
+
+    network["fingerprint"] = "wlan0/0100000A|10.0.0.5"
+    assert geo.load_cached_location(ttl=60) is None
+
+
+def test_ignores_payloads_without_area(network):
+    geo.save_location({"nearest_area": []})
+    assert geo.load_cached_location(ttl=60) is None
+
+
+def test_payload_cached_under_the_resolved_location(run_wttrbarpy, upstream):
+    args = ["--endpoint", upstream.endpoint, "--cache-ttl", "100"]
+
+    assert run_wttrbarpy(*args)["text"].endswith("15°")
+    assert run_wttrbarpy(*args)["text"].endswith("15°")
+    assert upstream.paths == ["/?format=j1"]
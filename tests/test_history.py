@@ -0,0 +1,85 @@
+import pytest
+
+from wttrbarpy.history import (
+    History,
+    Reading,
+    get_observation_time,
+    get_trend,
+    reading_from_data,
+)
+
+
+def make_reading(timestamp: float, temp_C: float = 10.0) -> Reading:
+    return Reading(
+        timestamp=timestamp,
+        temp_C=temp_C,
+        feels_like_C=temp_C - 1,
+        humidity=60.0,
+        pressure=1015.0,
+        windspeed_kmph=10.0,
+        winddir_degree=180,
+        weather_code=113,
+    )
+
+
+def test_ring_buffer_wraps(tmp_path):
+    with History(str(tmp_path / "h.bin"), capacity=3) as history:
+        for i in range(5):
+            assert history.append(make_reading(i * 3600, temp_C=i))
+
+        assert len(history) == 3
+        assert [x.temp_C for x in history] == [2, 3, 4]
+        assert history[-1].timestamp == 4 * 3600
+
+        with pytest.raises(IndexError):
+            history[3]
+
+
+def test_ignores_readings_that_are_not_newer(tmp_path):
+    with History(str(tmp_path / "h.bin"), capacity=3) as history:
+        assert history.append(make_reading(3600))
+        assert not history.append(make_reading(3600))
+        assert not history.append(make_reading(0))
+        assert len(history) == 1
+
+
+def test_persists_and_keeps_readings_on_resize(tmp_path):
+    path = str(tmp_path / "h.bin")
+    with History(path, capacity=4) as history:
+        for i in range(4):
+            history.append(make_reading(i * 3600, temp_C=i))
+
+    with History(path, capacity=2) as history:
+        assert [x.temp_C for x in history] == [2, 3]
+
+
+def test_trend_reports_the_actual_span(tmp_path):
+    with History(str(tmp_path / "h.bin"), capacity=10) as history:
+        assert get_trend(history, hours=6) is None
+
+        history.append(make_reading(0, temp_C=10))
+        history.append(make_reading(1800, temp_C=13))
+
+        trend = get_trend(history, hours=6)
+        assert trend["hours"] == 0.5
+        assert trend["temp_C"] == 3
+
+
+def test_trend_stays_within_the_window(tmp_path):
+    with History(str(tmp_path / "h.bin"), capacity=10) as history:
+        for i in range(10):
+            history.append(make_reading(i * 3600, temp_C=i))
+
+        trend = get_trend(history, hours=3)
+        assert trend["hours"] == 3
+        assert trend["temp_C"] == 3
+
+
+def test_reading_from_data(payload):
+    reading = reading_from_data(payload)
+
+    # 01:00 PM local, 11:00 AM UTC
+    assert get_observation_time(payload) == 1792407600
+    assert reading.timestamp == 1792407600
+    assert reading.temp_C == 15
+    assert reading.weather_code == 116
@@ -0,0 +1,100 @@
+from time import monotonic
+
+import pytest
+
+from wttrbarpy.providers import Provider, ProviderError, WttrProvider
+
+
+def test_provider_is_abstract():
+    with pytest.raises(TypeError):
+        Provider()
+
+
+def test_fetch(upstream, payload):
+    provider = WttrProvider([upstream.endpoint], timeout=5)
+
+    assert provider.fetch("Berlin") == payload
+    assert upstream.paths == ["/Berlin?format=j1"]
+
+
+def test_hedge_wins_over_slow_primary(upstream_factory, payload):
+    slow, fast = upstream_factory(), upstream_factory()
+    slow.delay = 2
+
+    provider = WttrProvider([slow.endpoint, fast.endpoint], timeout=5, hedge_delay=0.1)
+    start = monotonic()
+    assert provider.fetch("x") == payload
+    assert monotonic() - start < 1
+    assert provider.rank_endpoints()[0] == fast.endpoint
+
+
+def test_slow_primary_loses_its_rank(upstream_factory):
+    primary, mirror = upstream_factory(), upstream_factory()
+    provider = WttrProvider(
+        [primary.endpoint, mirror.endpoint], timeout=5, hedge_delay=0.1
+    )
+    provider.fetch("x")
+    assert provider.rank_endpoints()[0] == primary.endpoint
+
+    # the primary is still pending when the mirror wins, it must be re-ranked
+    primary.delay = 2
+    provider.fetch("x")
+    assert provider.rank_endpoints()[0] == mirror.endpoint
+
+    start = monotonic()
+    provider.fetch("x")
+    assert monotonic() - start < 0.1
+
+
+def test_failed_endpoint_falls_back(upstream_factory, payload):
+    broken, mirror = upstream_factory(), upstream_factory()
+    broken.fail = "error"
+
+    provider = WttrProvider([broken.endpoint, mirror.endpoint], timeout=5)
+    assert provider.fetch("x") == payload
+    assert provider.stats[broken.endpoint].failures == 1
+
+
+def test_quotes_the_location(upstream):
+    WttrProvider([upstream.endpoint], timeout=5).fetch("New York")
+    assert upstream.paths == ["/New%20York?format=j1"]
+
+
+def test_error_body_does_not_win_the_hedge(upstream_factory, payload):
+    broken, slow = upstream_factory(), upstream_factory()
+    broken.fail = "j1"
+    slow.delay = 0.3
+
+    provider = WttrProvider(
+        [broken.endpoint, slow.endpoint], timeout=5, hedge_delay=0.1
+    )
+    assert provider.fetch("x") == payload
+
+
+@pytest.mark.parametrize("fail", ["error", "json", "j1", "close"])
+def test_failures_raise_provider_error(upstream, fail):
+    upstream.fail = fail
+    provider = WttrProvider([upstream.endpoint], timeout=5)
+
+    with pytest.raises(ProviderError):
+        provider.fetch("x")
+
+
+def test_stats_are_persisted(upstream_factory, tmp_path):
+    slow, fast = upstream_factory(), upstream_factory()
+    slow.delay = 0.3
+    stats_file = str(tmp_path / "endpoints.json")
+
+    provider = WttrProvider(
+        [slow.endpoint, fast.endpoint],
+        timeout=5,
+        hedge_delay=0.05,
+        stats_file=stats_file,
+    )
+    provider.fetch("x")
+    provider.save_stats()
+
+    provider = WttrProvider(
+        [slow.endpoint, fast.endpoint], timeout=5, stats_file=stats_file
+    )
+    assert provider.rank_endpoints()[0] == fast.endpoint
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from json import loads
+from threading import Thread
+from time import sleep
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from wttrbarpy.providers import WttrProvider
+from wttrbarpy.proxy import ProxyCache, ProxyServer
+
+
+@pytest.fixture
+def make_proxy(upstream):
+    servers = []
+
+    def make(**kwargs) -> tuple[str, ProxyCache]:
+        provider = WttrProvider([upstream.endpoint], timeout=5)
+        cache = ProxyCache(provider, **kwargs)
+        server = ProxyServer(("127.0.0.1", 0), cache)
+        Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}", cache
+
+    yield make
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get(url: str, headers: dict | None = None) -> tuple[int, dict, bytes]:
+    try:
+        with urlopen(Request(url, headers=headers or {}), timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def test_coalesces_concurrent_misses(make_proxy, upstream, payload):
+    upstream.delay = 0.2
+    url, cache = make_proxy(ttl=60)
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        responses = list(executor.map(lambda _: get(f"{url}/Berlin"), range(40)))
+
+    assert all(status == 200 for status, _, _ in responses)
+    assert loads(responses[0][2]) == payload
+    assert upstream.hits == 1
+    assert cache.upstream_requests == 1
+
+
+def test_etag(make_proxy):
+    url, _ = make_proxy(ttl=60)
+
+    status, headers, _ = get(f"{url}/Berlin")
+    assert status == 200
+
+    status, _, body = get(f"{url}/Berlin", {"If-None-Match": headers["ETag"]})
+    assert status == 304
+    assert body == b""
+
+
+def test_refetches_after_ttl(make_proxy, upstream):
+    url, _ = make_proxy(ttl=0.1)
+
+    get(f"{url}/Berlin")
+    get(f"{url}/Berlin")
+    assert upstream.hits == 1
+
+    sleep(0.2)
+    get(f"{url}/Berlin")
+    assert upstream.hits == 2
+
+
+def test_quotes_the_location(make_proxy, upstream):
+    url, _ = make_proxy(ttl=60)
+
+    status, _, _ = get(f"{url}/New%20York?format=j1")
+    assert status == 200
+    assert upstream.paths == ["/New%20York?format=j1"]
+
+
+def test_unknown_locations_leave_no_locks(make_proxy, upstream):
+    upstream.fail = "error"
+    url, cache = make_proxy(ttl=60)
+
+    for i in range(20):
+        status, _, _ = get(f"{url}/bogus{i}")
+        assert status == 502
+
+    assert cache._key_locks == {}
+    assert len(cache._entries) == 0
+
+
+def test_serves_stale_entry_during_outage(make_proxy, upstream, payload):
+    url, _ = make_proxy(ttl=0.1, retry_delay=60)
+
+    get(f"{url}/Berlin")
+    sleep(0.2)
+    upstream.fail = "error"
+
+    for _ in range(5):
+        status, _, body = get(f"{url}/Berlin")
+        assert status == 200
+        assert loads(body) == payload
+
+    # one failed refresh, then the stale entry is served without retrying
+    assert upstream.hits == 2
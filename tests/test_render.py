@@ -0,0 +1,141 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from itertools import product
+
+import pytest
+
+from wttrbarpy import Options, render
+from wttrbarpy.fanout import get_day_view
+
+OPTION_SETS = (
+    Options(),
+    Options(emoji=True),
+    Options(unit="USCS", format_type=3, show_temp_unit=True),
+    Options(format_type=1, ampm=True, hide_wind_details=True),
+    Options(main_indicator="humidity", vertical_view=True),
+    Options(custom_indicator="$icon $temp_C ($FeelsLikeC)"),
+    Options(neutral_icon=True, plain_text=True, max_conditions=2),
+    Options(interpolate=True, offline_astronomy=True),
+)
+# the fixture is observed at 01:00 PM in Berlin (UTC+2)
+TIMES = (
+    datetime(2026, 10, 19, 0, 30),
+    datetime(2026, 10, 19, 13, 0),
+    datetime(2026, 10, 19, 22, 45),
+    datetime(2026, 10, 20, 15, 0),
+)
+
+
+@pytest.fixture
+def host_tz():
+    original = os.environ.get("TZ")
+
+    def set_tz(tz: str) -> None:
+        os.environ["TZ"] = tz
+        time.tzset()
+
+    yield set_tz
+
+    if original is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = original
+    time.tzset()
+
+
+def test_does_not_mutate_payload(payload):
+    original = deepcopy(payload)
+    for options in OPTION_SETS:
+        render(payload, options, now=TIMES[1])
+
+    assert payload == original
+
+
+def test_deterministic_under_threads(payload):
+    jobs = list(product(OPTION_SETS, TIMES))
+    expected = [render(payload, options, now=now) for options, now in jobs]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        for _ in range(5):
+            results = executor.map(lambda job: render(payload, *job), jobs)
+            assert list(results) == expected
+
+
+@pytest.mark.parametrize("tz", ["UTC", "America/New_York", "Asia/Dhaka"])
+def test_independent_of_host_timezone(payload, host_tz, tz):
+    jobs = list(product(OPTION_SETS, TIMES))
+    expected = [render(payload, options, now=now) for options, now in jobs]
+
+    host_tz(tz)
+    assert [render(payload, options, now=now) for options, now in jobs] == expected
+
+
+@pytest.mark.parametrize(
+    "aware",
+    [
+        datetime(2026, 10, 19, 13, 0, tzinfo=timezone.utc),
+        datetime(2026, 10, 19, 9, 0, tzinfo=timezone(timedelta(hours=-4))),
+    ],
+)
+def test_aware_now_is_converted_to_the_location(payload, aware):
+    local = datetime(2026, 10, 19, 15, 0)
+    for options in OPTION_SETS:
+        assert render(payload, options, now=aware) == render(
+            payload, options, now=local
+        )
+
+
+def test_payload_without_observation_is_taken_as_utc(payload, host_tz):
+    del payload["current_condition"][0]["observation_time"]
+    aware = datetime(2026, 10, 19, 13, 0, tzinfo=timezone.utc)
+    expected = render(payload, Options(), now=datetime(2026, 10, 19, 13, 0))
+
+    for tz in ("UTC", "Asia/Tokyo"):
+        host_tz(tz)
+        assert render(payload, Options(), now=aware) == expected
+
+
+def get_hours(tooltip: str, label: str) -> list[str]:
+    """Hours listed under the day starting with `label` of a plain text tooltip."""
+
+    for section in tooltip.split("\n\n"):
+        if section.startswith(label):
+            return [x.split()[0] for x in section.splitlines()[2:]]
+
+    raise AssertionError(f"no {label!r} in the tooltip")
+
+
+def test_hours_before_now_are_skipped_today(payload):
+    options = Options(format_type=1, plain_text=True)
+    tooltip = render(payload, options, now=datetime(2026, 10, 19, 20, 0))["tooltip"]
+
+    assert get_hours(tooltip, "Today, ") == ["21"]
+    assert len(get_hours(tooltip, "Tomorrow, ")) == 8
+
+
+def test_tomorrow_view_keeps_its_label_and_hours(payload):
+    options = Options(format_type=1, plain_text=True)
+    now = datetime(2026, 10, 19, 20, 0)
+    tooltip = render(get_day_view(payload, 1), options, now=now)["tooltip"]
+
+    assert "Today, " not in tooltip
+    assert len(get_hours(tooltip, "Tomorrow, ")) == 8
+
+
+def test_offline_astronomy_drops_past_days(payload):
+    tooltip = render(payload, Options(offline_astronomy=True), now=TIMES[3])["tooltip"]
+
+    assert "Today, Tuesday Oct 20" in tooltip
+    assert "Monday Oct 19" not in tooltip
+
+
+def test_interpolate_fades_into_the_forecast(payload):
+    options = Options(interpolate=True, custom_indicator="$temp_C")
+
+    # at observation time the observed value is kept
+    assert render(payload, options, now=TIMES[1])["text"] == "15"
+    # hours later it follows the forecast (14° at 18:00)
+    assert render(payload, options, now=datetime(2026, 10, 19, 18, 0))["text"] == "14"
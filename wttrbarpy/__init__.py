@@ -15,3 +15,7 @@ try:
         icons = json.load(f)
 except FileNotFoundError as e:
     raise FileNotFoundError("Failed to open icons.json")
+
+# public api, imported last since these modules use emojis and icons
+from wttrbarpy.config import Options
+from wttrbarpy.formats import render
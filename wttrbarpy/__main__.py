@@ -1,168 +1,147 @@
-from argparse import ArgumentParser
-from json import dumps, loads
-from urllib.error import HTTPError
+import os
+import subprocess
+import sys
+from importlib import import_module
+from json import dumps
+from time import time
 from urllib.parse import urlparse
-from urllib.request import urlopen
 
-from wttrbarpy.config import Config, build_config
-from wttrbarpy.formats import format_text, format_tooltip
+from wttrbarpy.cache import load_payload, lock_refresh, save_payload
+from wttrbarpy.config import build_config, get_parser
+from wttrbarpy.formats import format_output
+from wttrbarpy.geo import get_resolved_location, load_cached_location, save_location
+from wttrbarpy.history import get_trend, open_history, reading_from_data
+from wttrbarpy.providers import (
+    DEBUG_ENDPOINT,
+    DEFAULT_ENDPOINT,
+    ProviderError,
+    WttrProvider,
+)
+from wttrbarpy.utils import get_cache_dir
+
+# imported only when used, so a plain run doesn't load http.server and the like
+SUBCOMMANDS = {
+    "proxy": "wttrbarpy.proxy",
+    "fanout": "wttrbarpy.fanout",
+    "render": "wttrbarpy.batch",
+}
 
 
 def print_json(data: dict) -> None:
     print(dumps(data, ensure_ascii=False))
 
 
-def main() -> None:
-    parser = ArgumentParser(
-        prog="wttrbarpy",
-        description="a highly customizable weather module for Waybar",
-        allow_abbrev=False,
-    )
+def spawn_refresh(key: str) -> None:
+    # checking the lock here only avoids spawning a process for nothing,
+    # the refresh itself takes it again
+    lock = lock_refresh(key)
+    if lock is None:
+        return
+    lock.close()
 
-    parser.add_argument(
-        "--ampm",
-        action="store_true",
-        dest="ampm",
-        help="show time in AM/PM format. defaults to False",
-    )
-    parser.add_argument(
-        "--location",
-        "-l",
-        dest="location",
-        type=str,
-        default="",
-        help="specify a location. defaults to None (i.e your current location)",
-    )
-    parser.add_argument(
-        "--main-indicator",
-        dest="main_indicator",
-        type=str,
-        default="temp_C",
-        help="decide which current_conditions key will be shown on waybar. defaults to temp_C",
-    )
-    parser.add_argument(
-        "--custom-indicator",
-        dest="custom_indicator",
-        type=str,
-        default=None,
-        help="customize the indicator. example: $temp_C",
-    )
-    parser.add_argument(
-        "--date-format",
-        dest="date_format",
-        type=str,
-        default="%A %b %d",
-        help="formats the date next to the days. defaults to %%A-%%b-%%d",
-    )
-    parser.add_argument(
-        "--hide-conditions",
-        action="store_true",
-        dest="hide_conditions",
-        help='hide extra conditions next to each hour description. like "20° Cloudy" instead of "20° Cloudy, Overcast 81%%, Sunshine 13%%". defaults to False',
-    )
-    parser.add_argument(
-        "--hide-wind-details",
-        action="store_true",
-        dest="hide_wind_details",
-        help="removes extra wind details (wind direction and degree). defaults to False",
-    )
-    parser.add_argument(
-        "--max-conditions",
-        dest="max_conditions",
-        type=int,
-        default=0,
-        help="limit the number of conditions to show next to each hour description. defaults to 0 (shows all available)",
-    )
-    parser.add_argument(
-        "--fahrenheit",
-        "-f",
-        action="store_true",
-        dest="fahrenheit",
-        help="use fahrenheit instead of celsius. defaults to False",
-    )
-    parser.add_argument(
-        "--vertical-view",
-        action="store_true",
-        dest="vertical_view",
-        help="shows the icon on the first line and temperature in a new line (doesn't work for custom-indicator). defaults to False",
-    )
-    parser.add_argument(
-        "--format-type",
-        dest="format_type",
-        type=int,
-        default=2,
-        help="specify the global output format type (1 only text,  2 only icon/emoji, 3 text with icon/emoji). defaults to 2",
-    )
-    parser.add_argument(
-        "--hour-text-only",
-        action="store_true",
-        dest="hour_text_only",
-        help="show hour as text only. defaults to False",
-    )
-    parser.add_argument(
-        "--emoji",
-        action="store_true",
-        dest="emoji",
-        help="replace icons with emojis. defaults to False",
-    )
-    parser.add_argument(
-        "--neutral-icon",
-        action="store_true",
-        dest="neutral_icon",
-        help="show neutral icon instead of daytime/nighttime icons. defaults to False",
-    )
-    parser.add_argument(
-        "--plain-text",
-        action="store_true",
-        dest="plain_text",
-        help="shows the plain text removing all pango markup tags and json output. defaults to False",
-    )
-    parser.add_argument(
-        "--show-temp-unit",
-        action="store_true",
-        dest="show_temp_unit",
-        help="show temperature value with unit like 20°C or 20°F. defaults to False",
-    )
-    parser.add_argument(
-        "--version",
-        action="version",
-        version="%(prog)s 1.0.0",
-        help="show wttrbarpy version.",
+    subprocess.Popen(
+        [sys.executable, "-m", "wttrbarpy", *sys.argv[1:], "--refresh"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
     )
 
-    parser.add_argument(
-        "--debug",
-        action="store_true",
-        dest="debug_mode",
-        help="lets not spam wttr.in :)",
-    )
 
-    args = parser.parse_args()
+def save_fetched(query: str, data: dict, cache_ttl: int, use_geo_cache: bool) -> None:
+    """Cache a fetched payload, under the resolved "lat,lon" for an empty query.
+
+    That is the key the next run gets from the geo cache, and a payload of
+    an old network can't be served after the network changed.
+    """
+
+    if use_geo_cache and not query:
+        save_location(data)
+        query = get_resolved_location(data) or ""
+
+    if cache_ttl > 0 and query:
+        save_payload(query, data)
+
 
-    api_url = "https://wttr.in/{}?format=j1".format(args.location)
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        import_module(SUBCOMMANDS[sys.argv[1]]).main(sys.argv[2:])
+        return
+
+    args = get_parser().parse_args()
 
+    endpoints = args.endpoints or [DEFAULT_ENDPOINT]
     if args.debug_mode:
-        api_url = "http://0.0.0.0:8000/{}.json?format=j1".format(args.location)
-
-    try:
-        with urlopen(api_url, timeout=60) as response:
-            resp = response.read()
-            data = loads(resp.decode())
-    except HTTPError as e:
-        output = {"text": "⚠️", "tooltip": str(e)}
-        print_json(output)
+        endpoints = [DEBUG_ENDPOINT]
+
+    provider = WttrProvider(
+        endpoints=endpoints,
+        timeout=args.timeout,
+        hedge_delay=args.hedge_delay or None,
+        stats_file=os.path.join(get_cache_dir(), "endpoints.json"),
+    )
+
+    query = args.location
+    use_geo_cache = not query and not args.debug_mode and args.geo_cache_ttl > 0
+    if use_geo_cache:
+        query = load_cached_location(ttl=args.geo_cache_ttl) or ""
+
+    if args.refresh:
+        lock = lock_refresh(query)
+        if lock is None:
+            return  # another refresh is already running
+
+        with lock:
+            try:
+                data = provider.fetch(query)
+            except ProviderError:
+                return
+            finally:
+                provider.save_stats()
+
+            save_fetched(query, data, args.cache_ttl, use_geo_cache)
         return
 
-    config = build_config(data, args)
-    output = {
-        "text": format_text(config=config),
-        "tooltip": format_tooltip(config=config),
-    }
+    # an empty query is whatever the ip resolves to, it's never cached as is
+    cached = load_payload(query) if args.cache_ttl > 0 and query else None
+    stale = False
 
-    if not config.plain_text:
-        print_json(output)
+    if cached and time() - cached[1] < args.cache_ttl:
+        data = cached[0]
+    elif cached and args.stale_while_revalidate:
+        data = cached[0]
+        stale = True
+        spawn_refresh(query)
     else:
-        print_json(output["tooltip"])
+        try:
+            data = provider.fetch(query)
+        except ProviderError as e:
+            output = {"text": "⚠️", "tooltip": str(e)}
+            print_json(output)
+            return
+        finally:
+            provider.save_stats()
+
+        save_fetched(query, data, args.cache_ttl, use_geo_cache)
+
+    trend = None
+    if args.history_size > 0:
+        with open_history(args.location, capacity=args.history_size) as history:
+            try:
+                history.append(reading_from_data(data))
+            except (KeyError, IndexError, ValueError):
+                pass  # incomplete current_condition, nothing to record
+
+            if args.trend_hours > 0:
+                trend = get_trend(history, hours=args.trend_hours)
+
+    config = build_config(data, args, trend=trend)
+    output = format_output(config)
+
+    if stale and isinstance(output, dict):
+        output["class"] = "stale"
+
+    print_json(output)
 
 
 if __name__ == "__main__":
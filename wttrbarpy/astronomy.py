@@ -0,0 +1,196 @@
+from datetime import date, datetime, timedelta, timezone
+from math import acos, asin, cos, degrees, radians, sin
+
+J2000 = 2451545.0  # julian day of 2000-01-01 12:00 UTC
+J2000_ORDINAL = date(2000, 1, 1).toordinal()
+J2000_DATETIME = datetime(2000, 1, 1, 12, tzinfo=timezone.utc)
+SYNODIC_MONTH = 29.530588853
+NEW_MOON = 2451550.1  # julian day of the 2000-01-06 new moon
+
+# same names wttr.in uses, starting at the new moon
+MOON_PHASES = (
+    "New Moon",
+    "Waxing Crescent",
+    "First Quarter",
+    "Waxing Gibbous",
+    "Full Moon",
+    "Waning Gibbous",
+    "Last Quarter",
+    "Waning Crescent",
+)
+
+
+def to_julian_day(dt: datetime) -> float:
+    return J2000 + (dt - J2000_DATETIME).total_seconds() / 86400
+
+
+def from_julian_day(jd: float) -> datetime:
+    return J2000_DATETIME + timedelta(days=jd - J2000)
+
+
+def get_solar_transit(
+    day: date, latitude: float, longitude: float
+) -> tuple[float, float]:
+    """Compute the solar noon and the hour angle of sunrise/sunset.
+
+    see https://en.wikipedia.org/wiki/Sunrise_equation
+
+    Returns:
+        tuple[float, float]: julian day of the solar noon and the cosine of the
+            hour angle. The cosine is below -1 when the sun never sets that day
+            and above 1 when it never rises.
+    """
+
+    n = day.toordinal() - J2000_ORDINAL + 0.0008
+    mean_solar_time = n - longitude / 360
+
+    anomaly = (357.5291 + 0.98560028 * mean_solar_time) % 360
+    m = radians(anomaly)
+    center = 1.9148 * sin(m) + 0.02 * sin(2 * m) + 0.0003 * sin(3 * m)
+    ecliptic_longitude = radians((anomaly + center + 180 + 102.9372) % 360)
+    transit = (
+        J2000 + mean_solar_time + 0.0053 * sin(m) - 0.0069 * sin(2 * ecliptic_longitude)
+    )
+
+    declination = asin(sin(ecliptic_longitude) * sin(radians(23.4397)))
+    phi = radians(latitude)
+    cos_hour_angle = (sin(radians(-0.833)) - sin(phi) * sin(declination)) / (
+        cos(phi) * cos(declination)
+    )
+    return transit, cos_hour_angle
+
+
+def get_sun_times(
+    day: date, latitude: float, longitude: float
+) -> tuple[datetime | None, datetime | None]:
+    """Compute sunrise and sunset (UTC) of a day.
+
+    Returns:
+        tuple[datetime | None, datetime | None]: sunrise and sunset. Both are
+            None when the sun doesn't rise or set that day (polar day/night).
+    """
+
+    transit, cos_hour_angle = get_solar_transit(day, latitude, longitude)
+    if not -1 <= cos_hour_angle <= 1:
+        return None, None
+
+    hour_angle = degrees(acos(cos_hour_angle))
+    return (
+        from_julian_day(transit - hour_angle / 360),
+        from_julian_day(transit + hour_angle / 360),
+    )
+
+
+def get_moon_phase(dt: datetime) -> str:
+    age = ((to_julian_day(dt) - NEW_MOON) / SYNODIC_MONTH) % 1
+    return MOON_PHASES[int(age * 8 + 0.5) % 8]
+
+
+def get_utc_offset(data: dict) -> timedelta:
+    """Get the UTC offset of the location from its last observation.
+
+    Falls back to UTC, the timezone of this machine says nothing about the
+    location.
+    """
+
+    try:
+        current_condition = data["current_condition"][0]
+        local = datetime.strptime(
+            current_condition["localObsDateTime"], "%Y-%m-%d %I:%M %p"
+        )
+        utc = datetime.strptime(current_condition["observation_time"], "%I:%M %p")
+    except (KeyError, IndexError, ValueError):
+        return timedelta(0)
+
+    minutes = (local.hour - utc.hour) * 60 + local.minute - utc.minute
+    minutes = (minutes + 12 * 60) % (24 * 60) - 12 * 60  # -12h..+12h
+    return timedelta(minutes=round(minutes / 15) * 15)
+
+
+def get_local_time(data: dict, now: datetime | None = None) -> datetime:
+    """Get the wall clock time at the location, as a naive datetime.
+
+    A naive `now` is taken as the time at the location already and returned
+    as is, an aware one is converted with the UTC offset of the location.
+    Defaults to the current time.
+    """
+
+    if now is not None and now.tzinfo is None:
+        return now
+
+    if now is None:
+        now = datetime.now(timezone.utc)
+    utc_now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    return utc_now + get_utc_offset(data)
+
+
+def get_astronomy(
+    day: date, latitude: float, longitude: float, utc_offset: timedelta
+) -> dict:
+    """Compute a j1 style astronomy entry for a day at a location."""
+
+    sunrise, sunset = get_sun_times(day, latitude, longitude)
+
+    if sunrise is None:
+        # polar day/night, is_day() then sees the sun up all day or never
+        sunrise_txt = "12:00 AM"
+        if get_solar_transit(day, latitude, longitude)[1] < -1:
+            sunset_txt = "11:59 PM"
+        else:
+            sunset_txt = "12:00 AM"
+    else:
+        sunrise_txt = (sunrise + utc_offset).strftime("%I:%M %p")
+        sunset_txt = (sunset + utc_offset).strftime("%I:%M %p")
+
+    # the phase at local midnight, like wttr.in reports it
+    midnight = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+    return {
+        "sunrise": sunrise_txt,
+        "sunset": sunset_txt,
+        "moon_phase": get_moon_phase(midnight - utc_offset),
+    }
+
+
+def update_astronomy(data: dict, now: datetime | None = None) -> dict:
+    """Recompute the astronomy of a payload for the current date.
+
+    Days that already passed at the location are dropped, so an old payload
+    still starts at today, and the astronomy of every remaining day is
+    computed from the nearest_area coordinates. `now` is read like
+    get_local_time() does.
+    """
+
+    try:
+        nearest_area = data["nearest_area"][0]
+        latitude = float(nearest_area["latitude"])
+        longitude = float(nearest_area["longitude"])
+    except (KeyError, IndexError, ValueError):
+        return data
+
+    utc_offset = get_utc_offset(data)
+    today = get_local_time(data, now).date()
+
+    weather = [
+        day for day in data["weather"] if date.fromisoformat(day["date"]) >= today
+    ] or data["weather"][-1:]
+
+    return {
+        **data,
+        "weather": [
+            {
+                **day,
+                "astronomy": [
+                    {
+                        **day["astronomy"][0],
+                        **get_astronomy(
+                            date.fromisoformat(day["date"]),
+                            latitude=latitude,
+                            longitude=longitude,
+                            utc_offset=utc_offset,
+                        ),
+                    }
+                ],
+            }
+            for day in weather
+        ],
+    }
@@ -0,0 +1,202 @@
+import os
+import shlex
+import sys
+from argparse import ArgumentParser, ArgumentTypeError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from json import dumps, loads
+from time import perf_counter
+from typing import Iterator
+
+from wttrbarpy.config import Options, get_options, get_render_parser
+from wttrbarpy.formats import render
+
+# set once per worker process by init_worker()
+option_sets: list[Options] = []
+render_time: datetime | None = None  # None renders at the observation time
+
+
+def iter_payloads(paths: list[str]) -> Iterator[tuple[str, str]]:
+    """Lazily yield (source, raw json) pairs.
+
+    A path can be a payload file, a directory (walked recursively) or a
+    `.jsonl` archive with one payload per line.
+    """
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                yield from iter_payloads([os.path.join(root, x) for x in sorted(files)])
+        elif path.endswith(".jsonl"):
+            with open(path, "r") as f:
+                for lineno, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield f"{path}:{lineno}", line
+        else:
+            with open(path, "r") as f:
+                yield path, f.read()
+
+
+def iter_chunks(items: Iterator, size: int) -> Iterator[list]:
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def init_worker(raw_option_sets: list[list[str]], now: datetime | None) -> None:
+    global option_sets, render_time
+    parser = get_render_parser("wttrbarpy render --options")
+    option_sets = [get_options(parser.parse_args(x)) for x in raw_option_sets]
+    render_time = now
+
+
+def get_observed_at(data: dict) -> datetime:
+    return datetime.strptime(
+        data["current_condition"][0]["localObsDateTime"], "%Y-%m-%d %I:%M %p"
+    )
+
+
+def parse_now(value: str) -> datetime | None:
+    if value == "observed":
+        return None
+    return datetime.fromisoformat(value)
+
+
+def parse_positive(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def render_chunk(chunk: list[tuple[str, str]]) -> tuple[list[str], int, int]:
+    """Render a chunk of payloads with every option set.
+
+    Returns:
+        tuple[list[str], int, int]: the jsonl lines, how many renders were
+            attempted (payloads that aren't json have none) and how many of
+            the lines are errors.
+    """
+
+    lines = []
+    renders = 0
+    errors = 0
+    for source, raw in chunk:
+        try:
+            data = loads(raw)
+        except ValueError as e:
+            lines.append(dumps({"source": source, "error": f"invalid json: {e}"}))
+            errors += 1
+            continue
+
+        for idx, options in enumerate(option_sets):
+            record = {"source": source, "options": idx}
+            renders += 1
+            try:
+                now = render_time or get_observed_at(data)
+                record.update(render(data, options, now=now))
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+                errors += 1
+            lines.append(dumps(record, ensure_ascii=False))
+
+    return lines, renders, errors
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = ArgumentParser(
+        prog="wttrbarpy render",
+        description="render recorded j1 payloads offline with a set of options, in parallel",
+        allow_abbrev=False,
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="payload files, directories of them or .jsonl archives",
+    )
+    parser.add_argument(
+        "--options",
+        action="append",
+        dest="options",
+        type=str,
+        default=None,
+        help='wttrbarpy render options to render with, like --options="--emoji --format-type 3". can be repeated to render every payload with each of them. defaults to the default options',
+    )
+    parser.add_argument(
+        "--now",
+        dest="now",
+        type=parse_now,
+        default="observed",
+        help='time to render at, as an ISO datetime. without an offset it is the time at the location. "observed" renders every payload at its own observation time, so renders don\'t depend on when the batch runs. defaults to observed',
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        dest="output",
+        type=str,
+        default="-",
+        help="jsonl file to write the renders to. defaults to stdout",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        dest="jobs",
+        type=parse_positive,
+        default=os.cpu_count() or 1,
+        help="number of worker processes. defaults to the number of cpus",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=parse_positive,
+        default=64,
+        help="payloads sent to a worker at once. defaults to 64",
+    )
+    args = parser.parse_args(argv)
+
+    raw_option_sets = [shlex.split(x) for x in args.options or [""]]
+    init_worker(raw_option_sets, args.now)  # fail early on invalid options
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    payloads = 0
+    renders = 0
+    errors = 0
+    start = perf_counter()
+
+    def write_next() -> None:
+        nonlocal payloads, renders, errors
+        size, future = pending.popleft()
+        lines, chunk_renders, chunk_errors = future.result()
+        payloads += size
+        renders += chunk_renders
+        errors += chunk_errors
+        out.write("\n".join(lines) + "\n")
+
+    pending = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=args.jobs,
+        initializer=init_worker,
+        initargs=(raw_option_sets, args.now),
+    ) as executor:
+        # only a few chunks are in flight, so memory doesn't grow with the archive
+        for chunk in iter_chunks(iter_payloads(args.paths), args.chunk_size):
+            pending.append((len(chunk), executor.submit(render_chunk, chunk)))
+            if len(pending) >= args.jobs * 2:
+                write_next()
+
+        while pending:
+            write_next()
+
+    if out is not sys.stdout:
+        out.close()
+
+    elapsed = perf_counter() - start
+    print(
+        f"rendered {payloads} payloads x {len(raw_option_sets)} option sets "
+        f"({renders} renders, {errors} errors) in {elapsed:.2f}s: "
+        f"{payloads / elapsed:.0f} payloads/s, {renders / elapsed:.0f} renders/s",
+        file=sys.stderr,
+    )
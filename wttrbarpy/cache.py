@@ -0,0 +1,182 @@
+import marshal
+import os
+from fcntl import LOCK_EX, LOCK_NB, flock
+from hashlib import sha1
+from struct import Struct
+from sys import intern
+from time import time
+
+from wttrbarpy.utils import get_cache_dir
+
+# bump the magic whenever the projection changes, old entries are then ignored
+MAGIC = b"WBC2"
+HEADER = Struct("<4sd")  # magic, fetched at
+
+AREA_KEYS = ("areaName", "region", "country", "latitude", "longitude")
+DAY_KEYS = ("date", "maxtempC", "maxtempF", "mintempC", "mintempF")
+ASTRONOMY_KEYS = ("sunrise", "sunset", "moon_phase")
+HOUR_KEYS = (
+    "time",
+    "tempC",
+    "tempF",
+    "FeelsLikeC",
+    "FeelsLikeF",
+    "weatherCode",
+    "weatherDesc",
+    "windspeedKmph",
+    "windspeedMiles",
+    "winddirDegree",
+    "winddir16Point",
+    "humidity",
+    "pressure",
+    "chanceoffog",
+    "chanceoffrost",
+    "chanceofovercast",
+    "chanceofrain",
+    "chanceofsnow",
+    "chanceofsunshine",
+    "chanceofthunder",
+    "chanceofwindy",
+)
+NUMERIC_KEYS = frozenset(
+    (
+        "maxtempC",
+        "maxtempF",
+        "mintempC",
+        "mintempF",
+        "tempC",
+        "tempF",
+        "FeelsLikeC",
+        "FeelsLikeF",
+        "weatherCode",
+        "windspeedKmph",
+        "windspeedMiles",
+        "winddirDegree",
+        "humidity",
+        "pressure",
+        "chanceoffog",
+        "chanceoffrost",
+        "chanceofovercast",
+        "chanceofrain",
+        "chanceofsnow",
+        "chanceofsunshine",
+        "chanceofthunder",
+        "chanceofwindy",
+    )
+)
+
+
+def _compact(value):
+    if isinstance(value, str):
+        return intern(value)
+    elif isinstance(value, list):
+        return [_compact(x) for x in value]
+    elif isinstance(value, dict):
+        return {intern(k): _compact(v) for k, v in value.items()}
+    return value
+
+
+def _pick(data: dict, keys: tuple) -> dict:
+    picked = {}
+    for key in keys:
+        if key not in data:
+            continue
+
+        value = data[key]
+        if key in NUMERIC_KEYS and isinstance(value, str):
+            try:
+                value = int(value)
+            except ValueError:
+                pass
+        picked[key] = value
+
+    return picked
+
+
+def project(data: dict) -> dict:
+    """Keep only the parts of a j1 payload that wttrbarpy reads.
+
+    The result has the same shape as the payload, so the formatters can use
+    it as is. current_condition is kept whole since any of its keys can be
+    used as an indicator.
+    """
+
+    return _compact(
+        {
+            "current_condition": data["current_condition"],
+            "nearest_area": [_pick(x, AREA_KEYS) for x in data["nearest_area"]],
+            "weather": [
+                {
+                    **_pick(day, DAY_KEYS),
+                    "astronomy": [_pick(x, ASTRONOMY_KEYS) for x in day["astronomy"]],
+                    "hourly": [_pick(x, HOUR_KEYS) for x in day["hourly"]],
+                }
+                for day in data["weather"]
+            ],
+        }
+    )
+
+
+def dumps(data: dict, fetched_at: float) -> bytes:
+    # marshal stores repeated interned strings once and interns them on load
+    return HEADER.pack(MAGIC, fetched_at) + marshal.dumps(project(data), 4)
+
+
+def loads(raw: bytes) -> tuple[dict, float]:
+    if len(raw) < HEADER.size or raw[:4] != MAGIC:
+        raise ValueError("Invalid cache entry was passed.")
+
+    _, fetched_at = HEADER.unpack_from(raw)
+    return marshal.loads(raw[HEADER.size :]), fetched_at
+
+
+def get_payload_file(key: str) -> str:
+    path = os.path.join(get_cache_dir(), "payloads")
+    os.makedirs(path, exist_ok=True)
+
+    name = sha1(key.strip().lower().encode()).hexdigest()[:16]
+    return os.path.join(path, f"{name}.bin")
+
+
+def load_payload(key: str) -> tuple[dict, float] | None:
+    """Get a cached payload and the time it was fetched at.
+
+    Returns:
+        tuple[dict, float] | None: None if there is no usable entry.
+    """
+
+    try:
+        with open(get_payload_file(key), "rb") as f:
+            return loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def save_payload(key: str, data: dict, fetched_at: float | None = None) -> None:
+    try:
+        raw = dumps(data, fetched_at=time() if fetched_at is None else fetched_at)
+    except (KeyError, TypeError):
+        return  # not a j1 payload, don't cache it
+
+    tmp_file = f"{get_payload_file(key)}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(raw)
+    os.replace(tmp_file, get_payload_file(key))
+
+
+def lock_refresh(key: str):
+    """Take the refresh lock of a cache entry without waiting.
+
+    Returns:
+        file | None: the locked file, keep it open until the refresh is done.
+            None if another refresh of the same entry is already running.
+    """
+
+    f = open(f"{get_payload_file(key)[:-4]}.lock", "a")
+    try:
+        flock(f, LOCK_EX | LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+
+    return f
@@ -1,13 +1,40 @@
-from argparse import Namespace
+from argparse import SUPPRESS, ArgumentParser, Namespace
 from dataclasses import dataclass
+from datetime import datetime
 
+from wttrbarpy.astronomy import get_local_time, update_astronomy
+from wttrbarpy.interpolate import interpolate_current
 
-@dataclass
+
+@dataclass(frozen=True)
 class Emoji:
     enabled: bool
 
 
-@dataclass
+@dataclass(frozen=True)
+class Options:
+    """Render options, the defaults match the cli ones."""
+
+    unit: str = "SI"
+    ampm: bool = False
+    main_indicator: str = "temp_C"
+    custom_indicator: str | None = None
+    format_type: int = 2
+    hour_text_only: bool = False
+    plain_text: bool = False
+    hide_wind_details: bool = False
+    hide_conditions: bool = False
+    show_temp_unit: bool = False
+    max_conditions: int = 0
+    vertical_view: bool = False
+    date_format: str = "%A %b %d"
+    emoji: bool = False
+    neutral_icon: bool = False
+    interpolate: bool = False
+    offline_astronomy: bool = False
+
+
+@dataclass(frozen=True)
 class Config:
     data: dict
     unit: str
@@ -25,11 +52,12 @@ class Config:
     date_format: str
     emoji: Emoji
     neutral_icon: bool
+    now: datetime
+    trend: dict | None = None
 
 
-def build_config(data: dict, args: Namespace) -> Config:
-    return Config(
-        data=data,
+def get_options(args: Namespace) -> Options:
+    return Options(
         unit="USCS" if args.fahrenheit or (args.main_indicator == "temp_F") else "SI",
         ampm=args.ampm,
         main_indicator=args.main_indicator,
@@ -43,6 +71,288 @@ def build_config(data: dict, args: Namespace) -> Config:
         max_conditions=args.max_conditions,
         vertical_view=args.vertical_view,
         date_format=args.date_format,
-        emoji=Emoji(enabled=args.emoji),
+        emoji=args.emoji,
         neutral_icon=args.neutral_icon,
+        interpolate=args.interpolate,
+        offline_astronomy=args.offline_astronomy,
+    )
+
+
+def make_config(
+    data: dict,
+    options: Options,
+    trend: dict | None = None,
+    now: datetime | None = None,
+) -> Config:
+    """Build the config of a single render.
+
+    Args:
+        data (dict): j1 payload, it is never modified.
+        options (Options): render options.
+        trend (dict | None): changes from the history, see history.get_trend().
+        now (datetime | None): the time to render for. a naive datetime is the
+            wall clock time at the location, an aware one is converted to it.
+            defaults to the current time.
+    """
+
+    # everything below reads the clock of the location, never the host's
+    now = get_local_time(data, now)
+
+    # before update_astronomy, which drops the slots of past days
+    if options.interpolate:
+        data = interpolate_current(data, now=now)
+    if options.offline_astronomy:
+        data = update_astronomy(data, now=now)
+
+    return Config(
+        data=data,
+        unit=options.unit,
+        ampm=options.ampm,
+        main_indicator=options.main_indicator,
+        custom_indicator=options.custom_indicator,
+        format_type=options.format_type,
+        hour_text_only=options.hour_text_only,
+        plain_text=options.plain_text,
+        hide_wind_details=options.hide_wind_details,
+        hide_conditions=options.hide_conditions,
+        show_temp_unit=options.show_temp_unit,
+        max_conditions=options.max_conditions,
+        vertical_view=options.vertical_view,
+        date_format=options.date_format,
+        emoji=Emoji(enabled=options.emoji),
+        neutral_icon=options.neutral_icon,
+        now=now,
+        trend=trend,
+    )
+
+
+def build_config(
+    data: dict,
+    args: Namespace,
+    trend: dict | None = None,
+    now: datetime | None = None,
+) -> Config:
+    return make_config(data, get_options(args), trend=trend, now=now)
+
+
+def add_provider_arguments(parser: ArgumentParser) -> None:
+    """Add the options of the WttrProvider, shared by every command."""
+
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        dest="endpoints",
+        type=str,
+        default=None,
+        help="wttr.in compatible endpoint, {} is replaced by the location. can be repeated to add mirrors. defaults to https://wttr.in/{}?format=j1",
+    )
+    parser.add_argument(
+        "--hedge-delay",
+        dest="hedge_delay",
+        type=float,
+        default=3.0,
+        help="seconds to wait for an endpoint before also asking the next one. 0 disables hedging. defaults to 3",
+    )
+    parser.add_argument(
+        "--timeout",
+        dest="timeout",
+        type=float,
+        default=60,
+        help="timeout of a single request in seconds. defaults to 60",
+    )
+
+
+def add_render_arguments(parser: ArgumentParser) -> None:
+    """Add the options that only change how a payload is rendered."""
+
+    parser.add_argument(
+        "--ampm",
+        action="store_true",
+        dest="ampm",
+        help="show time in AM/PM format. defaults to False",
+    )
+    parser.add_argument(
+        "--main-indicator",
+        dest="main_indicator",
+        type=str,
+        default="temp_C",
+        help="decide which current_conditions key will be shown on waybar. defaults to temp_C",
+    )
+    parser.add_argument(
+        "--custom-indicator",
+        dest="custom_indicator",
+        type=str,
+        default=None,
+        help="customize the indicator. example: $temp_C",
+    )
+    parser.add_argument(
+        "--date-format",
+        dest="date_format",
+        type=str,
+        default="%A %b %d",
+        help="formats the date next to the days. defaults to %%A-%%b-%%d",
+    )
+    parser.add_argument(
+        "--hide-conditions",
+        action="store_true",
+        dest="hide_conditions",
+        help='hide extra conditions next to each hour description. like "20° Cloudy" instead of "20° Cloudy, Overcast 81%%, Sunshine 13%%". defaults to False',
     )
+    parser.add_argument(
+        "--hide-wind-details",
+        action="store_true",
+        dest="hide_wind_details",
+        help="removes extra wind details (wind direction and degree). defaults to False",
+    )
+    parser.add_argument(
+        "--max-conditions",
+        dest="max_conditions",
+        type=int,
+        default=0,
+        help="limit the number of conditions to show next to each hour description. defaults to 0 (shows all available)",
+    )
+    parser.add_argument(
+        "--fahrenheit",
+        "-f",
+        action="store_true",
+        dest="fahrenheit",
+        help="use fahrenheit instead of celsius. defaults to False",
+    )
+    parser.add_argument(
+        "--vertical-view",
+        action="store_true",
+        dest="vertical_view",
+        help="shows the icon on the first line and temperature in a new line (doesn't work for custom-indicator). defaults to False",
+    )
+    parser.add_argument(
+        "--format-type",
+        dest="format_type",
+        type=int,
+        default=2,
+        help="specify the global output format type (1 only text,  2 only icon/emoji, 3 text with icon/emoji). defaults to 2",
+    )
+    parser.add_argument(
+        "--hour-text-only",
+        action="store_true",
+        dest="hour_text_only",
+        help="show hour as text only. defaults to False",
+    )
+    parser.add_argument(
+        "--emoji",
+        action="store_true",
+        dest="emoji",
+        help="replace icons with emojis. defaults to False",
+    )
+    parser.add_argument(
+        "--neutral-icon",
+        action="store_true",
+        dest="neutral_icon",
+        help="show neutral icon instead of daytime/nighttime icons. defaults to False",
+    )
+    parser.add_argument(
+        "--plain-text",
+        action="store_true",
+        dest="plain_text",
+        help="shows the plain text removing all pango markup tags and json output. defaults to False",
+    )
+    parser.add_argument(
+        "--show-temp-unit",
+        action="store_true",
+        dest="show_temp_unit",
+        help="show temperature value with unit like 20°C or 20°F. defaults to False",
+    )
+    parser.add_argument(
+        "--interpolate",
+        action="store_true",
+        dest="interpolate",
+        help="estimate the current conditions from the hourly forecast around now, so an old payload doesn't show stale values. defaults to False",
+    )
+    parser.add_argument(
+        "--offline-astronomy",
+        action="store_true",
+        dest="offline_astronomy",
+        help="compute sunrise, sunset and moon phase locally for the current date and skip days that already passed, so long cached payloads stay correct. defaults to False",
+    )
+
+
+def get_render_parser(prog: str) -> ArgumentParser:
+    """Parser of the render options alone, for option sets of other commands."""
+
+    parser = ArgumentParser(prog=prog, allow_abbrev=False)
+    add_render_arguments(parser)
+    return parser
+
+
+def get_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="wttrbarpy",
+        description="a highly customizable weather module for Waybar",
+        epilog="see `wttrbarpy proxy --help` to serve j1 data to other wttrbarpy clients, `wttrbarpy fanout --help` to render several modules from one fetch and `wttrbarpy render --help` to render recorded payloads offline",
+        allow_abbrev=False,
+    )
+
+    add_render_arguments(parser)
+    parser.add_argument(
+        "--location",
+        "-l",
+        dest="location",
+        type=str,
+        default="",
+        help="specify a location. defaults to None (i.e your current location)",
+    )
+    add_provider_arguments(parser)
+    parser.add_argument(
+        "--cache-ttl",
+        dest="cache_ttl",
+        type=int,
+        default=0,
+        help="reuse a fetched payload for this many seconds. defaults to 0 (disabled)",
+    )
+    parser.add_argument(
+        "--stale-while-revalidate",
+        action="store_true",
+        dest="stale_while_revalidate",
+        help='show an expired cached payload right away (with the "stale" class) and refresh it in the background for the next run. needs --cache-ttl. defaults to False',
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        dest="refresh",
+        help=SUPPRESS,  # used by the background refresh of --stale-while-revalidate
+    )
+    parser.add_argument(
+        "--geo-cache-ttl",
+        dest="geo_cache_ttl",
+        type=int,
+        default=86400,
+        help="when no location is given, reuse the coordinates wttr.in resolved for your ip for this many seconds (or until the network changes). 0 disables it. defaults to 86400",
+    )
+    parser.add_argument(
+        "--history-size",
+        dest="history_size",
+        type=int,
+        default=168,
+        help="number of observed readings to keep per location. 0 disables the history. defaults to 168",
+    )
+    parser.add_argument(
+        "--trend-hours",
+        dest="trend_hours",
+        type=int,
+        default=0,
+        help="show how the conditions changed over the last N hours in the tooltip. defaults to 0 (hidden)",
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version="%(prog)s 1.0.0",
+        help="show wttrbarpy version.",
+    )
+
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        dest="debug_mode",
+        help="lets not spam wttr.in :)",
+    )
+
+    return parser
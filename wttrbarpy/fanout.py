@@ -0,0 +1,194 @@
+import os
+import stat
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass
+from json import dumps, load
+from time import monotonic, sleep
+
+from wttrbarpy.config import add_provider_arguments, build_config, get_render_parser
+from wttrbarpy.formats import format_output
+from wttrbarpy.providers import DEFAULT_ENDPOINT, Provider, WttrProvider
+
+
+@dataclass
+class View:
+    name: str
+    output: str
+    args: Namespace
+    day: int = 0
+
+
+def load_views(path: str) -> list[View]:
+    """Load the views from a json file.
+
+    The file holds a list of views like
+    `{"name": "wind", "output": "/tmp/wttr-wind", "args": ["--custom-indicator", "$windspeedKmph"]}`
+    where `args` are wttrbarpy render options and the optional `day` (0 today,
+    1 tomorrow, ...) shows that day's forecast in place of the current conditions.
+    Options that don't change the render (`--location`, `--cache-ttl`, ...) are
+    rejected, they belong to the fanout command itself.
+    """
+
+    with open(path, "r") as f:
+        raw_views = load(f)
+
+    parser = get_render_parser("wttrbarpy fanout view")
+    views = []
+    for raw_view in raw_views:
+        try:
+            views.append(
+                View(
+                    name=raw_view["name"],
+                    output=raw_view["output"],
+                    args=parser.parse_args(raw_view.get("args", [])),
+                    day=int(raw_view.get("day", 0)),
+                )
+            )
+        except KeyError as e:
+            raise KeyError(f"View is missing the {e} key: {raw_view}") from e
+
+    return views
+
+
+def get_day_view(data: dict, day: int) -> dict:
+    """Make the forecast of `day` look like the current conditions.
+
+    The noon slot of the day is used as current_condition and the days before
+    it are dropped, so every formatter works on it unchanged. The observation
+    time is kept, the utc offset of the location is derived from it.
+    """
+
+    if day == 0:
+        return data
+
+    weather = data["weather"][day:]
+    if not weather:
+        raise ValueError(f"Invalid day ({day}) was passed.")
+
+    slot = min(weather[0]["hourly"], key=lambda x: abs(int(x["time"]) - 1200))
+    observed = data["current_condition"][0]
+    current_condition = {
+        **slot,
+        "localObsDateTime": observed["localObsDateTime"],
+        "observation_time": observed["observation_time"],
+        "temp_C": slot["tempC"],
+        "temp_F": slot["tempF"],
+        "maxtempC": weather[0]["maxtempC"],
+        "maxtempF": weather[0]["maxtempF"],
+        "mintempC": weather[0]["mintempC"],
+        "mintempF": weather[0]["mintempF"],
+    }
+
+    return {**data, "current_condition": [current_condition], "weather": weather}
+
+
+def write_output(path: str, line: str) -> None:
+    """Write a line for a module to pick up.
+
+    `-` is stdout, a fifo gets the line appended (and is skipped while nobody
+    reads it) and a regular file is atomically replaced, so `tail -F` works.
+    """
+
+    if path == "-":
+        print(line, flush=True)
+        return
+
+    try:
+        is_fifo = stat.S_ISFIFO(os.stat(path).st_mode)
+    except FileNotFoundError:
+        is_fifo = False
+
+    if is_fifo:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            return  # no reader
+        try:
+            os.write(fd, f"{line}\n".encode())
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+        return
+
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        f.write(f"{line}\n")
+    os.replace(tmp_file, path)
+
+
+def render_views(provider: Provider, location: str, views: list[View]) -> None:
+    """Fetch once and write every view."""
+
+    try:
+        data = provider.fetch(location)
+    except Exception as e:  # keep the resident loop alive whatever happens
+        line = dumps({"text": "⚠️", "tooltip": str(e)}, ensure_ascii=False)
+        for view in views:
+            write_output(view.output, line)
+        return
+
+    for view in views:
+        try:
+            config = build_config(get_day_view(data, view.day), view.args)
+            output = format_output(config)
+        except Exception as e:
+            output = {"text": "⚠️", "tooltip": f"{view.name}: {e}"}
+
+        write_output(view.output, dumps(output, ensure_ascii=False))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = ArgumentParser(
+        prog="wttrbarpy fanout",
+        description="fetch once and render several views, one per Waybar module",
+        allow_abbrev=False,
+    )
+    parser.add_argument(
+        "--views",
+        dest="views",
+        type=str,
+        required=True,
+        help="json file with the list of views to render",
+    )
+    parser.add_argument(
+        "--location",
+        "-l",
+        dest="location",
+        type=str,
+        default="",
+        help="specify a location. defaults to None (i.e your current location)",
+    )
+    parser.add_argument(
+        "--interval",
+        dest="interval",
+        type=int,
+        default=3600,
+        help="seconds between fetches. defaults to 3600",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        dest="once",
+        help="render the views once and exit. defaults to False",
+    )
+    add_provider_arguments(parser)
+    args = parser.parse_args(argv)
+
+    views = load_views(args.views)
+    provider = WttrProvider(
+        endpoints=args.endpoints or [DEFAULT_ENDPOINT],
+        timeout=args.timeout,
+        hedge_delay=args.hedge_delay or None,
+    )
+
+    while True:
+        start = monotonic()
+        render_views(provider, args.location, views)
+        if args.once:
+            return
+
+        try:
+            sleep(max(0, args.interval - (monotonic() - start)))
+        except KeyboardInterrupt:
+            return
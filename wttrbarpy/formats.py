@@ -2,7 +2,7 @@ from datetime import datetime
 from string import Template
 
 from wttrbarpy import emojis, icons
-from wttrbarpy.config import Config
+from wttrbarpy.config import Config, Options, make_config
 from wttrbarpy.utils import (
     gen_brief_report,
     get_clock_icon,
@@ -86,7 +86,7 @@ def format_wind_txt(data: dict, config: Config) -> str:
     return txt
 
 
-def format_location_txt(config: Config) -> str | ValueError:
+def format_location_txt(config: Config) -> str:
     degree = emojis["degree"]
 
     txt = ""
@@ -128,7 +128,29 @@ def format_location_txt(config: Config) -> str | ValueError:
             txt += f' ({icons["latitude"]} lat: {latitude} {icons["longitude"]} lon: {longitude})'
 
     else:
-        ValueError(f"Invalid location format type ({config.format_type}) was passed.")
+        raise ValueError(
+            f"Invalid location format type ({config.format_type}) was passed."
+        )
+
+    return txt
+
+
+def format_trend_txt(config: Config) -> str:
+    trend = config.trend
+    degree = emojis["degree"]
+
+    if config.unit == "USCS":
+        temp = trend["temp_C"] * 9 / 5
+        feels_like = trend["feels_like_C"] * 9 / 5
+    else:
+        temp = trend["temp_C"]
+        feels_like = trend["feels_like_C"]
+
+    txt = f"Trend ({trend['hours']:g}h): "
+    txt += f"temp {round(temp):+d}{degree}, "
+    txt += f"feels like {round(feels_like):+d}{degree}, "
+    txt += f"humidity {round(trend['humidity']):+d}%, "
+    txt += f"pressure {round(trend['pressure']):+d} hPa"
 
     return txt
 
@@ -182,7 +204,7 @@ def format_day_report_2nd_line(config: Config) -> str:
         )
 
     else:
-        ValueError(
+        raise ValueError(
             f"Invalid day report 2nd line format type ({config.format_type}) was passed."
         )
 
@@ -226,13 +248,17 @@ def format_days_report(config: Config):
     txt = ""
 
     days = config.data["weather"]
-    for i, day in enumerate(days):
+    today = config.now.date()
+    for day in days:
+        # from the date rather than the position, the first day isn't always today
+        offset = (datetime.strptime(day["date"], "%Y-%m-%d").date() - today).days
+
         tmp = ""
-        if i == 0:
+        if offset == 0:
             tmp += f"Today, "
-        elif i == 1:
+        elif offset == 1:
             tmp += f"Tomorrow, "
-        elif i == 2:
+        elif offset == 2:
             tmp += f"Day after tomorrow, "
 
         tmp += f'{format_date(day["date"],fmt_str=config.date_format)}'
@@ -244,10 +270,10 @@ def format_days_report(config: Config):
 
         tmp += format_day_report_2nd_line(config=config)
 
-        curr_hour = datetime.now().strftime("%H")
+        curr_hour = config.now.strftime("%H")
         for hour in day["hourly"]:
             hr_txt = format_hour_txt(hour=hour["time"], config=config)
-            if i == 0:
+            if offset == 0:
                 if int(hour["time"].replace("00", "")) < int(curr_hour):
                     continue
 
@@ -299,12 +325,15 @@ def format_tooltip(config: Config) -> str:
     txt += f"Wind: {format_wind_txt(data=current_condition,config=config)}\n"
     
     today_astronomy = config.data["weather"][0]["astronomy"][0]
-    if not is_day(today_astronomy):
+    if not is_day(today_astronomy, now=config.now):
         moon_phase_icon=get_moon_phase_icon(phase=today_astronomy['moon_phase'],emoji=config.emoji.enabled)
         txt += f"Moon Phase: {moon_phase_icon} ({today_astronomy['moon_phase']})\n"
     
     txt += f"UV Index: {current_condition['uvIndex']} ({get_uv_index_lvl(current_condition['uvIndex'])}) \n"
 
+    if config.trend:
+        txt += format_trend_txt(config) + "\n"
+
     txt += format_location_txt(config)
     txt += "\n\n"
     txt += format_days_report(config)
@@ -320,7 +349,7 @@ def format_text(config: Config):
         icon_type = "neutral"
     else:
         today_astronomy = config.data["weather"][0]["astronomy"][0]
-        if is_day(today_astronomy):
+        if is_day(today_astronomy, now=config.now):
             icon_type = "day"
         else:
             icon_type = "night"
@@ -340,17 +369,18 @@ def format_text(config: Config):
             raise KeyError(f"Invalid placeholder: {e}") from e
 
     else:
-        if config.main_indicator in temp_keys:
-            if config.main_indicator == "temp_C" and config.unit == "USCS":
-                config.main_indicator = "temp_F"
+        main_indicator = config.main_indicator
+        if main_indicator in temp_keys:
+            if main_indicator == "temp_C" and config.unit == "USCS":
+                main_indicator = "temp_F"
 
             text = format_temp_txt(
-                current_condition[config.main_indicator],
+                current_condition[main_indicator],
                 unit=config.unit,
                 show_temp_unit=config.show_temp_unit,
             )
         else:
-            text = current_condition[config.main_indicator]
+            text = current_condition[main_indicator]
 
     if config.custom_indicator:
         return text
@@ -359,3 +389,41 @@ def format_text(config: Config):
         return f"{weather_icon}\n{text}"
     else:
         return f"{weather_icon} {text}"
+
+
+def format_module(config: Config) -> dict:
+    return {
+        "text": format_text(config=config),
+        "tooltip": format_tooltip(config=config),
+    }
+
+
+def format_output(config: Config) -> dict | str:
+    output = format_module(config)
+    return output["tooltip"] if config.plain_text else output
+
+
+def render(
+    payload: dict,
+    options: Options = Options(),
+    now: datetime | None = None,
+    trend: dict | None = None,
+) -> dict:
+    """Render a j1 payload without side effects.
+
+    Nothing shared is modified and the clock is only read when `now` isn't
+    given, so it is safe to call from many threads at once.
+
+    Args:
+        payload (dict): j1 payload, it is never modified.
+        options (Options): render options.
+        now (datetime | None): the time to render for. a naive datetime is the
+            wall clock time at the location, an aware one is converted to it.
+            defaults to the current time.
+        trend (dict | None): changes from the history, see history.get_trend().
+
+    Returns:
+        dict: the "text" and "tooltip" of the module.
+    """
+
+    return format_module(make_config(payload, options, trend=trend, now=now))
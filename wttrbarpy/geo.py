@@ -0,0 +1,98 @@
+import os
+import socket
+from json import dump, load
+from time import time
+
+from wttrbarpy.utils import get_cache_dir
+
+
+def get_default_route() -> str:
+    """Get the interface and gateway of the default route from /proc/net/route."""
+
+    try:
+        with open("/proc/net/route", "r") as f:
+            next(f)  # header
+            for line in f:
+                fields = line.split()
+                if len(fields) > 2 and fields[1] == "00000000":
+                    return f"{fields[0]}/{fields[2]}"
+    except (OSError, StopIteration):
+        pass
+
+    return ""
+
+
+def get_local_address() -> str:
+    # connecting an udp socket only picks the outgoing address, nothing is sent
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("192.0.2.1", 53))
+            return s.getsockname()[0]
+    except OSError:
+        return ""
+
+
+def get_network_fingerprint() -> str:
+    return f"{get_default_route()}|{get_local_address()}"
+
+
+def get_geo_cache_file() -> str:
+    return os.path.join(get_cache_dir(), "geo.json")
+
+
+def load_cached_location(ttl: int) -> str | None:
+    """Get the cached "lat,lon" of the current location.
+
+    Args:
+        ttl (int): max age of the cached location in seconds.
+
+    Returns:
+        str | None: the location, or None if it's missing, too old or the
+            network changed since it was resolved.
+    """
+
+    try:
+        with open(get_geo_cache_file(), "r") as f:
+            cache = load(f)
+        latitude = cache["latitude"]
+        longitude = cache["longitude"]
+        expired = time() - float(cache["time"]) > ttl
+        fingerprint = cache["fingerprint"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if expired or fingerprint != get_network_fingerprint():
+        return None
+
+    return f"{latitude},{longitude}"
+
+
+def get_resolved_location(data: dict) -> str | None:
+    """Get the "lat,lon" wttr.in resolved a payload to."""
+
+    try:
+        nearest_area = data["nearest_area"][0]
+        return f"{nearest_area['latitude']},{nearest_area['longitude']}"
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def save_location(data: dict) -> None:
+    try:
+        nearest_area = data["nearest_area"][0]
+        latitude = nearest_area["latitude"]
+        longitude = nearest_area["longitude"]
+    except (KeyError, IndexError, TypeError):
+        return
+
+    cache = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "time": time(),
+        "fingerprint": get_network_fingerprint(),
+    }
+
+    tmp_file = f"{get_geo_cache_file()}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        dump(cache, f)
+    os.replace(tmp_file, get_geo_cache_file())
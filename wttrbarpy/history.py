@@ -0,0 +1,225 @@
+import mmap
+import os
+from bisect import bisect_left
+from dataclasses import astuple, dataclass
+from datetime import datetime, timedelta, timezone
+from fcntl import LOCK_EX, LOCK_UN, flock
+from hashlib import sha1
+from struct import Struct
+from time import time
+
+from wttrbarpy.utils import get_cache_dir
+
+MAGIC = b"WBH1"
+HEADER = Struct("<4sIII")  # magic, capacity, head (next write slot), count
+RECORD = Struct("<dfffffHH")
+
+
+@dataclass
+class Reading:
+    timestamp: float
+    temp_C: float
+    feels_like_C: float
+    humidity: float
+    pressure: float
+    windspeed_kmph: float
+    winddir_degree: int
+    weather_code: int
+
+
+class History:
+    """Fixed size ring buffer of readings backed by a memory mapped file.
+
+    Index 0 is the oldest reading and -1 the newest one. Appending and
+    reading a single item are O(1), the file never grows past
+    `HEADER.size + capacity * RECORD.size` bytes.
+    """
+
+    def __init__(self, path: str, capacity: int = 168) -> None:
+        if capacity < 1:
+            raise ValueError(f"Invalid history capacity ({capacity}) was passed.")
+
+        self.path = path
+        self.capacity = capacity
+
+        old_readings = []
+        self._file = open(path, "a+b")
+        flock(self._file, LOCK_EX)
+        try:
+            size = HEADER.size + capacity * RECORD.size
+            header = self._read_header()
+
+            if header is None or header[1] != capacity:
+                if header is not None:
+                    # capacity changed, keep the newest readings we can
+                    self._mmap = mmap.mmap(self._file.fileno(), 0)
+                    old_readings = list(self)[-capacity:]
+                    self._mmap.close()
+
+                self._file.truncate(0)
+                self._file.truncate(size)
+                self._mmap = mmap.mmap(self._file.fileno(), size)
+                HEADER.pack_into(self._mmap, 0, MAGIC, capacity, 0, 0)
+                for reading in old_readings:
+                    self._append(reading)
+            else:
+                self._mmap = mmap.mmap(self._file.fileno(), size)
+        finally:
+            flock(self._file, LOCK_UN)
+
+    def _read_header(self) -> tuple | None:
+        self._file.seek(0)
+        raw = self._file.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            return None
+
+        header = HEADER.unpack(raw)
+        if header[0] != MAGIC or header[1] < 1:
+            return None
+
+        size = HEADER.size + header[1] * RECORD.size
+        if os.fstat(self._file.fileno()).st_size != size:
+            return None
+
+        return header
+
+    def _state(self) -> tuple[int, int, int]:
+        _, capacity, head, count = HEADER.unpack_from(self._mmap, 0)
+        return capacity, head, count
+
+    def __len__(self) -> int:
+        return self._state()[2]
+
+    def __getitem__(self, idx: int) -> Reading:
+        capacity, head, count = self._state()
+
+        if idx < 0:
+            idx += count
+        if idx < 0 or idx >= count:
+            raise IndexError("history index out of range")
+
+        slot = (head - count + idx) % capacity
+        return Reading(
+            *RECORD.unpack_from(self._mmap, HEADER.size + slot * RECORD.size)
+        )
+
+    def _append(self, reading: Reading) -> None:
+        capacity, head, count = self._state()
+        RECORD.pack_into(
+            self._mmap, HEADER.size + head * RECORD.size, *astuple(reading)
+        )
+        HEADER.pack_into(
+            self._mmap,
+            0,
+            MAGIC,
+            capacity,
+            (head + 1) % capacity,
+            min(count + 1, capacity),
+        )
+
+    def append(self, reading: Reading) -> bool:
+        """Store a reading unless it isn't newer than the last one.
+
+        Returns:
+            bool: True if the reading was stored.
+        """
+
+        flock(self._file, LOCK_EX)
+        try:
+            if len(self) and self[-1].timestamp >= reading.timestamp:
+                return False
+            self._append(reading)
+            return True
+        finally:
+            flock(self._file, LOCK_UN)
+
+    def find(self, timestamp: float) -> int:
+        """Index of the oldest reading taken at or after `timestamp`."""
+        return bisect_left(self, timestamp, key=lambda x: x.timestamp)
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "History":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def get_observation_time(data: dict) -> float:
+    """Get the UTC timestamp of the current_condition observation.
+
+    wttr.in gives the local date/time and the UTC time of the observation, the
+    UTC date is whichever one puts both times the closest together.
+    """
+
+    current_condition = data["current_condition"][0]
+    try:
+        local = datetime.strptime(
+            current_condition["localObsDateTime"], "%Y-%m-%d %I:%M %p"
+        )
+        utc_time = datetime.strptime(
+            current_condition["observation_time"], "%I:%M %p"
+        ).time()
+    except (KeyError, ValueError):
+        return time()
+
+    utc = min(
+        (
+            datetime.combine(local.date() + timedelta(days=i), utc_time)
+            for i in (-1, 0, 1)
+        ),
+        key=lambda x: abs(x - local),
+    )
+    return utc.replace(tzinfo=timezone.utc).timestamp()
+
+
+def reading_from_data(data: dict) -> Reading:
+    current_condition = data["current_condition"][0]
+    return Reading(
+        timestamp=get_observation_time(data),
+        temp_C=float(current_condition["temp_C"]),
+        feels_like_C=float(current_condition["FeelsLikeC"]),
+        humidity=float(current_condition["humidity"]),
+        pressure=float(current_condition["pressure"]),
+        windspeed_kmph=float(current_condition["windspeedKmph"]),
+        winddir_degree=int(current_condition["winddirDegree"]),
+        weather_code=int(current_condition["weatherCode"]),
+    )
+
+
+def get_trend(history: History, hours: int) -> dict | None:
+    """Compare the newest reading with the oldest one within `hours` of it.
+
+    Returns:
+        dict | None: the changes and the hours they actually span, which is
+            less than `hours` while the history is still short. None if there
+            is nothing to compare with.
+    """
+
+    if len(history) < 2:
+        return None
+
+    newest = history[-1]
+    idx = history.find(newest.timestamp - hours * 3600)
+    if idx >= len(history) - 1:
+        return None
+
+    oldest = history[idx]
+    return {
+        "hours": round((newest.timestamp - oldest.timestamp) / 3600, 1),
+        "temp_C": newest.temp_C - oldest.temp_C,
+        "feels_like_C": newest.feels_like_C - oldest.feels_like_C,
+        "humidity": newest.humidity - oldest.humidity,
+        "pressure": newest.pressure - oldest.pressure,
+    }
+
+
+def open_history(location: str, capacity: int) -> History:
+    path = os.path.join(get_cache_dir(), "history")
+    os.makedirs(path, exist_ok=True)
+
+    name = sha1(location.strip().lower().encode()).hexdigest()[:16]
+    return History(os.path.join(path, f"{name}.bin"), capacity=capacity)
@@ -0,0 +1,166 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from wttrbarpy.astronomy import get_local_time
+
+EPOCH = datetime(1970, 1, 1)
+
+# current_condition key: hourly key
+FIELDS = {
+    "temp_C": "tempC",
+    "temp_F": "tempF",
+    "FeelsLikeC": "FeelsLikeC",
+    "FeelsLikeF": "FeelsLikeF",
+    "windspeedKmph": "windspeedKmph",
+    "windspeedMiles": "windspeedMiles",
+    "humidity": "humidity",
+    "pressure": "pressure",
+    "winddirDegree": "winddirDegree",
+}
+CHANCE_FIELDS = (
+    "chanceoffog",
+    "chanceoffrost",
+    "chanceofovercast",
+    "chanceofrain",
+    "chanceofsnow",
+    "chanceofsunshine",
+    "chanceofthunder",
+    "chanceofwindy",
+)
+CIRCULAR_FIELDS = ("winddirDegree",)
+COMPASS = "N NNE NE ENE E ESE SE SSE S SSW SW WSW W WNW NW NNW".split()
+
+# how long the difference between the observation and the forecast is kept
+CORRECTION_PERIOD = 3 * 3600
+
+
+@dataclass
+class Slots:
+    """The hourly slots of a payload as parallel arrays, sorted by time."""
+
+    times: list[float]  # local time of the location, seconds since epoch
+    values: dict[str, list[float]]
+    hours: list[dict]
+
+
+def to_seconds(dt: datetime) -> float:
+    return (dt - EPOCH).total_seconds()
+
+
+def build_slots(data: dict) -> Slots:
+    slots = []
+    for day in data["weather"]:
+        date = datetime.strptime(day["date"], "%Y-%m-%d")
+        for hour in day["hourly"]:
+            time = int(hour["time"])
+            slot_time = date + timedelta(hours=time // 100, minutes=time % 100)
+            slots.append((to_seconds(slot_time), hour))
+    slots.sort(key=lambda x: x[0])
+
+    values = {}
+    for key in (*FIELDS.values(), *CHANCE_FIELDS):
+        try:
+            values[key] = [float(hour[key]) for _, hour in slots]
+        except (KeyError, ValueError):
+            pass  # not in this payload, leave it as observed
+
+    return Slots(
+        times=[x[0] for x in slots],
+        values=values,
+        hours=[x[1] for x in slots],
+    )
+
+
+def interpolate_circular(a: float, b: float, weight: float) -> float:
+    return (a + ((b - a + 180) % 360 - 180) * weight) % 360
+
+
+def get_value(slots: Slots, key: str, timestamp: float) -> float:
+    idx = bisect_right(slots.times, timestamp)
+    values = slots.values[key]
+
+    if idx == 0:
+        return values[0]
+    if idx == len(values):
+        return values[-1]
+
+    start, end = slots.times[idx - 1], slots.times[idx]
+    weight = (timestamp - start) / (end - start)
+    if key in CIRCULAR_FIELDS:
+        return interpolate_circular(values[idx - 1], values[idx], weight)
+
+    return values[idx - 1] + (values[idx] - values[idx - 1]) * weight
+
+
+def interpolate_current(data: dict, now: datetime | None = None) -> dict:
+    """Estimate the current conditions from the hourly slots around now.
+
+    The difference between the observation and the forecast at observation
+    time fades out over CORRECTION_PERIOD, so a fresh payload still shows the
+    observed values and an old one follows the forecast. Once most of that
+    difference is gone, the weather code and description come from the
+    nearest slot. `now` is read like get_local_time() does.
+    """
+
+    try:
+        slots = build_slots(data)
+        current_condition = data["current_condition"][0]
+        observed_at = to_seconds(
+            datetime.strptime(
+                current_condition["localObsDateTime"], "%Y-%m-%d %I:%M %p"
+            )
+        )
+    except (KeyError, IndexError, ValueError):
+        return data
+
+    if not slots.times:
+        return data
+
+    timestamp = to_seconds(get_local_time(data, now))
+
+    if timestamp <= observed_at:
+        return data
+
+    fade = max(0.0, 1 - (timestamp - observed_at) / CORRECTION_PERIOD)
+    current = dict(current_condition)
+
+    for key, hour_key in FIELDS.items():
+        if hour_key not in slots.values:
+            continue
+
+        value = get_value(slots, hour_key, timestamp)
+        try:
+            error = float(current_condition[key]) - get_value(
+                slots, hour_key, observed_at
+            )
+        except (KeyError, ValueError):
+            error = 0.0
+
+        if key in CIRCULAR_FIELDS:
+            value = (value + ((error + 180) % 360 - 180) * fade) % 360
+        else:
+            value += error * fade
+
+        value = round(value)
+        if key in CIRCULAR_FIELDS:
+            value %= 360
+        current[key] = str(value)
+
+    for key in CHANCE_FIELDS:
+        if key in slots.values:
+            current[key] = str(round(get_value(slots, key, timestamp)))
+
+    if "winddirDegree" in slots.values:
+        degree = int(current["winddirDegree"])
+        current["winddir16Point"] = COMPASS[int(degree / 22.5 + 0.5) % 16]
+
+    if fade < 0.5:
+        idx = min(
+            range(len(slots.times)), key=lambda x: abs(slots.times[x] - timestamp)
+        )
+        nearest = slots.hours[idx]
+        current["weatherCode"] = nearest["weatherCode"]
+        current["weatherDesc"] = nearest["weatherDesc"]
+
+    return {**data, "current_condition": [current]}
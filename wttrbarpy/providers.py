@@ -0,0 +1,190 @@
+import os
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from json import dump, load, loads
+from queue import Empty, Queue
+from threading import Lock, Thread
+from time import monotonic
+from urllib.parse import quote
+from urllib.request import urlopen
+
+DEFAULT_ENDPOINT = "https://wttr.in/{}?format=j1"
+DEBUG_ENDPOINT = "http://0.0.0.0:8000/{}.json?format=j1"
+J1_KEYS = ("current_condition", "weather", "nearest_area")
+
+
+class ProviderError(Exception):
+    """Raised when no endpoint returned usable j1 data."""
+
+
+class Provider(ABC):
+    """Base class for anything that returns wttr.in j1 shaped data."""
+
+    @abstractmethod
+    def fetch(self, location: str) -> dict:
+        """Fetch the j1 data of a location.
+
+        Raises:
+            ProviderError: the data couldn't be fetched.
+        """
+
+
+@dataclass
+class EndpointStats:
+    latency: float = 0.0  # exponentially weighted moving average (seconds)
+    samples: int = 0
+    failures: int = 0  # consecutive failures, reset on success
+
+    def record(self, latency: float, alpha: float = 0.3) -> None:
+        if self.samples:
+            self.latency = alpha * latency + (1 - alpha) * self.latency
+        else:
+            self.latency = latency
+        self.samples += 1
+        self.failures = 0
+
+    def record_censored(self, elapsed: float, alpha: float = 0.3) -> None:
+        """Record a request that was abandoned after `elapsed` seconds.
+
+        Its real latency is at least that, so the average is never lowered.
+        """
+
+        failures = self.failures
+        self.record(max(elapsed, self.latency), alpha=alpha)
+        self.failures = failures
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+    def score(self) -> float:
+        if not self.samples:
+            return float("inf")
+        return self.latency * (1 + self.failures)
+
+
+class WttrProvider(Provider):
+    """Fetch j1 data from one or more wttr.in compatible endpoints.
+
+    Endpoints are url templates where `{}` is replaced by the location. The
+    fastest known endpoint is tried first; if it hasn't answered after
+    `hedge_delay` seconds (or it failed) the next one is started as well and
+    the first good response wins.
+
+    Args:
+        endpoints (list[str]): endpoint url templates, in order of preference.
+        timeout (float): timeout for a single request.
+        hedge_delay (float | None): seconds to wait before hedging. None disables
+            hedging, so the next endpoint is only tried after a failure.
+        stats_file (str | None): json file to persist latency stats between runs.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        timeout: float = 60,
+        hedge_delay: float | None = None,
+        stats_file: str | None = None,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("At least one endpoint is required.")
+
+        self.endpoints = list(dict.fromkeys(endpoints))
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.stats_file = stats_file
+        self.stats = {endpoint: EndpointStats() for endpoint in self.endpoints}
+        self._lock = Lock()
+
+        if stats_file:
+            self.load_stats()
+
+    def load_stats(self) -> None:
+        try:
+            with open(self.stats_file, "r") as f:
+                saved = load(f)
+        except (FileNotFoundError, ValueError):
+            return
+
+        for endpoint in self.endpoints:
+            if isinstance(saved.get(endpoint), dict):
+                try:
+                    self.stats[endpoint] = EndpointStats(**saved[endpoint])
+                except TypeError:
+                    pass
+
+    def save_stats(self) -> None:
+        if not self.stats_file:
+            return
+
+        with self._lock:
+            stats = {endpoint: asdict(s) for endpoint, s in self.stats.items()}
+
+        tmp_file = f"{self.stats_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            dump(stats, f)
+        os.replace(tmp_file, self.stats_file)
+
+    def rank_endpoints(self) -> list[str]:
+        # sorted() is stable, so endpoints without samples keep the given order
+        with self._lock:
+            return sorted(self.endpoints, key=lambda x: self.stats[x].score())
+
+    def _request(self, endpoint: str, location: str, results: Queue) -> None:
+        start = monotonic()
+        # commas separate coordinates, + and @ have a meaning for wttr.in
+        url = endpoint.format(quote(location, safe=",+@"))
+        try:
+            with urlopen(url, timeout=self.timeout) as response:
+                data = loads(response.read().decode())
+            # wttr.in answers unknown locations with a json error body
+            if not isinstance(data, dict) or not all(x in data for x in J1_KEYS):
+                raise ValueError(f"Not a j1 payload: {str(data)[:100]}")
+        except Exception as e:
+            results.put((endpoint, False, e, monotonic() - start))
+            return
+
+        results.put((endpoint, True, data, monotonic() - start))
+
+    def fetch(self, location: str) -> dict:
+        results = Queue()
+        remaining = self.rank_endpoints()
+        started = {}  # endpoint: start time, until it answers
+        error = None
+
+        while remaining or started:
+            if remaining:
+                endpoint = remaining.pop(0)
+                started[endpoint] = monotonic()
+                # daemon threads, so a hung loser never delays the exit
+                Thread(
+                    target=self._request,
+                    args=(endpoint, location, results),
+                    daemon=True,
+                ).start()
+
+            timeout = None
+            if remaining and self.hedge_delay is not None:
+                timeout = self.hedge_delay
+
+            try:
+                endpoint, ok, result, latency = results.get(timeout=timeout)
+            except Empty:
+                continue  # primary is slow, start the next endpoint too
+
+            del started[endpoint]
+            with self._lock:
+                if ok:
+                    self.stats[endpoint].record(latency)
+                    # the losers are left running, count the time they already
+                    # took so a primary that became slow loses its rank
+                    now = monotonic()
+                    for loser, start in started.items():
+                        self.stats[loser].record_censored(now - start)
+                else:
+                    self.stats[endpoint].record_failure()
+
+            if ok:
+                return result
+            error = result
+
+        raise ProviderError(str(error)) from error
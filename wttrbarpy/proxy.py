@@ -0,0 +1,241 @@
+from argparse import ArgumentParser
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from threading import Lock
+from time import monotonic
+from urllib.parse import unquote, urlsplit
+
+from wttrbarpy.config import add_provider_arguments
+from wttrbarpy.providers import DEFAULT_ENDPOINT, Provider, WttrProvider
+
+
+@dataclass(frozen=True)
+class Entry:
+    body: bytes
+    etag: str
+    fetched_at: float
+
+
+class ProxyCache:
+    """In memory j1 cache that asks the upstream at most once per ttl per location.
+
+    Concurrent misses of the same location wait for a single upstream request
+    instead of sending their own. If the upstream fails, the expired entry is
+    served when there is one, and keeps being served for `retry_delay` seconds
+    before the upstream is asked again.
+    """
+
+    def __init__(
+        self,
+        provider: Provider,
+        ttl: float,
+        max_entries: int = 256,
+        retry_delay: float = 60,
+    ) -> None:
+        self.provider = provider
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.retry_delay = retry_delay
+        self.upstream_requests = 0
+        self._entries = OrderedDict()
+        self._key_locks = {}  # key: [lock, number of requests using it]
+        self._lock = Lock()
+
+    def _lookup(self, key: str) -> Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, entry: Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_fresh(self, entry: Entry) -> bool:
+        return monotonic() - entry.fetched_at < self.ttl
+
+    def get(self, location: str) -> Entry:
+        key = location.strip().lower()
+
+        entry = self._lookup(key)
+        if entry is not None and self.is_fresh(entry):
+            return entry
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, [Lock(), 0])
+            key_lock[1] += 1
+
+        try:
+            with key_lock[0]:
+                return self._refresh(key, location)
+        finally:
+            # only misses in flight hold a lock, so unknown paths can't pile up
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+
+    def _refresh(self, key: str, location: str) -> Entry:
+        # someone else may have refreshed it while we were waiting
+        entry = self._lookup(key)
+        if entry is not None and self.is_fresh(entry):
+            return entry
+
+        with self._lock:
+            self.upstream_requests += 1
+
+        try:
+            data = self.provider.fetch(location)
+        except Exception:
+            if entry is None:
+                raise
+
+            # serve the expired entry for a while instead of retrying the
+            # upstream (and waiting up to its timeout) on every request
+            entry = Entry(
+                body=entry.body,
+                etag=entry.etag,
+                fetched_at=monotonic() - self.ttl + self.retry_delay,
+            )
+            self._store(key, entry)
+            return entry
+
+        body = dumps(data, ensure_ascii=False).encode()
+        entry = Entry(
+            body=body,
+            etag=f'"{sha1(body).hexdigest()[:16]}"',
+            fetched_at=monotonic(),
+        )
+        self._store(key, entry)
+        return entry
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ProxyServer"
+
+    def do_GET(self) -> None:
+        self.respond(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self.respond(send_body=False)
+
+    def respond(self, send_body: bool) -> None:
+        location = unquote(urlsplit(self.path).path.lstrip("/"))
+        cache = self.server.cache
+
+        try:
+            entry = cache.get(location)
+        except Exception as e:
+            self.send_error(502, explain=str(e))
+            return
+
+        max_age = max(0, int(cache.ttl - (monotonic() - entry.fetched_at)))
+
+        etags = [x.strip() for x in self.headers.get("If-None-Match", "").split(",")]
+        if entry.etag in etags or "*" in etags:
+            self.send_response(304)
+            self.send_header("ETag", entry.etag)
+            self.send_header("Cache-Control", f"max-age={max_age}")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", entry.etag)
+        self.send_header("Cache-Control", f"max-age={max_age}")
+        self.send_header("Content-Length", str(len(entry.body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(entry.body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple, cache: ProxyCache, verbose: bool = False):
+        super().__init__(address, ProxyHandler)
+        self.cache = cache
+        self.verbose = verbose
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = ArgumentParser(
+        prog="wttrbarpy proxy",
+        description="serve wttr.in j1 data to many wttrbarpy clients, asking the upstream at most once per ttl per location",
+        allow_abbrev=False,
+    )
+    parser.add_argument(
+        "--host",
+        dest="host",
+        type=str,
+        default="127.0.0.1",
+        help="address to listen on, use 0.0.0.0 to serve the LAN. defaults to 127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        dest="port",
+        type=int,
+        default=8080,
+        help="port to listen on. defaults to 8080",
+    )
+    parser.add_argument(
+        "--ttl",
+        dest="ttl",
+        type=int,
+        default=1800,
+        help="seconds to serve a location from memory before asking the upstream again. defaults to 1800",
+    )
+    parser.add_argument(
+        "--retry-delay",
+        dest="retry_delay",
+        type=int,
+        default=60,
+        help="seconds to keep serving an expired location after the upstream failed to refresh it. defaults to 60",
+    )
+    parser.add_argument(
+        "--max-entries",
+        dest="max_entries",
+        type=int,
+        default=256,
+        help="number of locations to keep in memory. defaults to 256",
+    )
+    add_provider_arguments(parser)
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        dest="verbose",
+        help="log every request. defaults to False",
+    )
+    args = parser.parse_args(argv)
+
+    provider = WttrProvider(
+        endpoints=args.endpoints or [DEFAULT_ENDPOINT],
+        timeout=args.timeout,
+        hedge_delay=args.hedge_delay or None,
+    )
+    cache = ProxyCache(
+        provider,
+        ttl=args.ttl,
+        max_entries=args.max_entries,
+        retry_delay=args.retry_delay,
+    )
+
+    with ProxyServer((args.host, args.port), cache, verbose=args.verbose) as server:
+        print(f"serving j1 on http://{args.host}:{args.port}/{{location}}?format=j1")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,3 +1,4 @@
+import os
 from datetime import datetime
 from functools import lru_cache
 
@@ -5,6 +6,15 @@ from wttrbarpy import emojis, icons
 from wttrbarpy.config import Config
 
 
+def get_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    path = os.path.join(base, "wttrbarpy")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
 def hour12_to_hour24(hour: str) -> str:
     hour = int(hour.replace("00", ""))
     am_or_pm = "PM" if hour >= 12 else "AM"
@@ -17,9 +27,9 @@ def hour12_to_hour24(hour: str) -> str:
     return f"{hour}{am_or_pm}"
 
 
-def is_day(data: dict) -> bool:
+def is_day(data: dict | str, now: datetime | None = None) -> bool:
     if isinstance(data, dict):
-        curr_time = datetime.now().time()
+        curr_time = (now or datetime.now()).time()
         sunrise = datetime.strptime(data["sunrise"], "%I:%M %p").time()
         sunset = datetime.strptime(data["sunset"], "%I:%M %p").time()
         return curr_time >= sunrise and curr_time <= sunset
@@ -312,7 +322,7 @@ def gen_brief_report(data: dict, config: Config, hr_txt: str = None):
     if config.neutral_icon:
         icon_type = "neutral"
     else:
-        icon_type = "day" if is_day(hr_txt) else "night"
+        icon_type = "day" if is_day(hr_txt, now=config.now) else "night"
 
     return {
         "temp": temp,